@@ -0,0 +1,128 @@
+# api_metrics.py
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_scope = threading.local()
+
+
+@contextmanager
+def module_scope(module_name):
+    """Tag every API call made inside the block with module_name"""
+    previous = getattr(_scope, "module", None)
+    _scope.module = module_name
+    try:
+        yield
+    finally:
+        _scope.module = previous
+
+
+def current_module():
+    """Module tag of the running code ("app" outside any page, "background" in timer threads)"""
+    return getattr(_scope, "module", None) or ("app" if _in_script_thread() else "background")
+
+
+def _in_script_thread():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx(suppress_warning=True) is not None
+    except Exception:
+        return False
+
+
+class ApiMetrics:
+    """Process-wide counters and latency histograms for Google API calls"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}  # Format: {(service, module, operation): {...}}
+        self._dump_thread = None
+
+    def record(self, service, operation, seconds, retries=0, quota_errors=0, failed=False, module=None):
+        """Record one logical call (retries and 429s of that call are counted separately)"""
+        key = (service, module or current_module(), operation)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    "calls": 0, "retries": 0, "quota_errors": 0, "failures": 0,
+                    "total_seconds": 0.0, "histogram": [0] * len(LATENCY_BUCKETS)
+                }
+            stats["calls"] += 1
+            stats["retries"] += retries
+            stats["quota_errors"] += quota_errors
+            stats["failures"] += 1 if failed else 0
+            stats["total_seconds"] += seconds
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats["histogram"][index] += 1
+                    break
+
+    @staticmethod
+    def _percentile(histogram, pct):
+        """Upper bound of the bucket containing the pct-th percentile"""
+        total = sum(histogram)
+        if not total:
+            return 0.0
+        threshold = total * pct / 100
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram):
+            running += count
+            if running >= threshold:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def snapshot(self):
+        """One row per (service, module, operation), sorted by call count"""
+        with self._lock:
+            rows = [
+                {
+                    "service": service,
+                    "module": module,
+                    "operation": operation,
+                    "calls": stats["calls"],
+                    "retries": stats["retries"],
+                    "429s": stats["quota_errors"],
+                    "failures": stats["failures"],
+                    "avg_ms": round(stats["total_seconds"] / stats["calls"] * 1000, 1),
+                    "p50_ms": self._percentile(stats["histogram"], 50) * 1000,
+                    "p95_ms": self._percentile(stats["histogram"], 95) * 1000,
+                    "histogram": list(stats["histogram"]),
+                }
+                for (service, module, operation), stats in self._stats.items()
+            ]
+        return sorted(rows, key=lambda row: row["calls"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def dump(self, path):
+        """Append the current totals to a JSON-lines log file"""
+        line = json.dumps({"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "metrics": self.snapshot()})
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def start_periodic_dump(self, path, interval=300):
+        """Dump every `interval` seconds from a daemon thread (started once per process)"""
+        with self._lock:
+            if self._dump_thread is not None:
+                return
+            self._dump_thread = threading.Thread(target=self._dump_loop, args=(path, interval), daemon=True)
+            self._dump_thread.start()
+
+    def _dump_loop(self, path, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.dump(path)
+            except OSError:
+                pass
+
+
+# Shared by the Sheets and Drive handlers of this server process
+api_metrics = ApiMetrics()
@@ -0,0 +1,200 @@
+# benchmarks/bench_modules.py
+"""Per-rerun API calls, bytes and render time of every module, against fake_sheets
+
+Usage:
+    python benchmarks/bench_modules.py --sizes 100 1000 10000 --reruns 10 --output bench.json
+
+Each module is driven through Streamlit's AppTest with a fresh handler (cold cache)
+per data size. The first run is reported as "cold", the following reruns as "warm".
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from streamlit.testing.v1 import AppTest
+
+from fake_sheets import FakeClient
+from google_sheet_utils import GoogleSheetHandler, SheetDataCache, SheetsRateLimiter
+
+SPREADSHEET_NAME = "Student"
+# Benchmarks count calls, they should never wait on (or be shed by) the quota model
+UNLIMITED_QUOTAS = {"read": {"per_user": 10 ** 9}, "write": {"per_user": 10 ** 9}}
+
+# (module path, render function, session state the module expects from main.py)
+MODULES = {
+    "attendance": ("modules.attendance", "render_attendance", {}),
+    "groups": ("modules.groups", "render_groups", {
+        "group_logged_in": True, "current_group": "Group 1", "current_group_code": "AY3KP9MQ"
+    }),
+    "money_transfers": ("modules.money_transfers", "render_money_transfers", {"tra_records": []}),
+    "calendar": ("modules.calendar", "render_calendar", {
+        "cal_events": [], "cal_current_month": None
+    }),
+    "credit_rewards": ("modules.credit_rewards", "render_credit_rewards", {}),
+}
+
+
+def _app_script():
+    """AppTest script: renders the module named in session state"""
+    import importlib
+    import streamlit as st
+    module = importlib.import_module(st.session_state["bench_module"])
+    getattr(module, st.session_state["bench_render"])()
+
+
+# ---------------------- Fixture data ----------------------
+def attendance_rows(size):
+    meetings = 10
+    members = max(1, size // meetings)
+    rows = [["member_id", "member_name", "meeting_id", "meeting_name", "is_present", "updated_at"]]
+    for member_id in range(1, members + 1):
+        for meeting_id in range(1, meetings + 1):
+            rows.append([
+                member_id, f"Member {member_id}", meeting_id, f"Meeting {meeting_id}",
+                "TRUE" if (member_id + meeting_id) % 3 else "FALSE", "2025-01-01 00:00:00"
+            ])
+    return rows
+
+
+def groups_rows(size):
+    codes = ["AY3KP9MQ", "FT7DR2SW", "GH5JK8LZ", "BN4VC6XL", "ES2WF3RG", "ZX9CV7BN", "QR8TY6UI", "PO5IU3YT"]
+    rows = [["group_code", "data_type", "uuid", "name", "student_id", "date", "amount", "description", "created_at"]]
+    for i in range(size):
+        data_type = ("member", "income", "expense")[i % 3]
+        if data_type == "member":
+            rows.append([codes[i % 8], data_type, f"uuid-{i}", f"Student {i}", f"S{i:05d}", "", "", "",
+                         "2025-01-01 00:00:00"])
+        else:
+            rows.append([codes[i % 8], data_type, f"uuid-{i}", "", "", "2025-01-01", f"{i % 500 + 10:.2f}",
+                         f"Item {i}", "2025-01-01 00:00:00"])
+    return rows
+
+
+def transfers_rows(size):
+    rows = [["uuid", "date", "type", "amount", "description", "handler"]]
+    start = date(2024, 9, 1)
+    for i in range(size):
+        rows.append([f"uuid-{i}", (start + timedelta(days=i % 365)).strftime("%Y-%m-%d"),
+                     "Income" if i % 2 else "Expense", f"{i % 300 + 1}.5", f"Transfer {i}", "Treasurer"])
+    return rows
+
+
+def calendar_rows(size):
+    start = date(2020, 1, 1)
+    return [["date", "event"]] + [
+        [(start + timedelta(days=i)).strftime("%Y-%m-%d"), f"Event {i}"] for i in range(size)
+    ]
+
+
+def credits_rows(size):
+    return [["Student", "Credits"]] + [[f"Student {i}", i % 200] for i in range(size)]
+
+
+def seed(client, size):
+    spreadsheet = client.create(SPREADSHEET_NAME)
+    spreadsheet.seed_worksheet("Attendance", attendance_rows(size))
+    spreadsheet.seed_worksheet("AllGroupsData", groups_rows(size))
+    spreadsheet.seed_worksheet("MoneyTransfers", transfers_rows(size))
+    spreadsheet.seed_worksheet("Calendar", calendar_rows(size))
+    spreadsheet.seed_worksheet("credits", credits_rows(size))
+    spreadsheet.seed_worksheet("information", [["Reward Content", "Required Credits"], ["Milk Tea", 50]])
+
+
+# ---------------------- Runner ----------------------
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_module(name, size, reruns, latency):
+    module_path, render_name, state = MODULES[name]
+    client = FakeClient(latency=latency)
+    seed(client, size)
+    handler = GoogleSheetHandler(
+        credentials_path="", client=client, drive=client.drive,
+        cache=SheetDataCache(), rate_limiter=SheetsRateLimiter(quotas=UNLIMITED_QUOTAS)
+    )
+    # Modules look the backend up through their own module-level name
+    module = importlib.import_module(module_path)
+    module.get_storage_backend = lambda **kwargs: handler
+
+    app = AppTest.from_function(_app_script, default_timeout=120)
+    app.session_state["bench_module"] = module_path
+    app.session_state["bench_render"] = render_name
+    app.session_state["auth_is_admin"] = True
+    app.session_state["auth_logged_in"] = True
+    for key, value in state.items():
+        app.session_state[key] = value
+    if "cal_current_month" in state:
+        app.session_state["cal_current_month"] = date.today().replace(day=1)
+
+    runs = []
+    for _ in range(reruns + 1):
+        client.reset_counters()
+        started = time.perf_counter()
+        app.run()
+        elapsed = time.perf_counter() - started
+        handler.flush_writes()
+        runs.append({
+            "seconds": elapsed,
+            "api_calls": client.total_calls,
+            "bytes": client.bytes_transferred,
+            "calls": dict(client.calls),
+            "exception": [str(e.message) for e in app.exception] or None
+        })
+
+    cold, warm = runs[0], runs[1:] or runs[:1]
+    warm_times = [run["seconds"] for run in warm]
+    return {
+        "module": name,
+        "rows": size,
+        "cold": cold,
+        "warm": {
+            "reruns": len(warm),
+            "api_calls_per_rerun": statistics.mean(run["api_calls"] for run in warm),
+            "bytes_per_rerun": statistics.mean(run["bytes"] for run in warm),
+            "p50_seconds": _percentile(warm_times, 50),
+            "p95_seconds": _percentile(warm_times, 95),
+        },
+        "errors": [run["exception"] for run in runs if run["exception"]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=list(MODULES), choices=list(MODULES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--reruns", type=int, default=5, help="Warm reruns after the first (cold) run")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake per-call API latency in seconds")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "latency": args.latency,
+        "results": [
+            bench_module(name, size, args.reruns, args.latency)
+            for name in args.modules
+            for size in args.sizes
+        ],
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_startup.py
+"""Time to the first (logged-out) render of main.py, and the modules it pulls in
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --budget 1.5
+
+Each run starts a fresh interpreter, imports Streamlit, then renders main.py's landing page
+and login form once through AppTest. The run fails the budget if the render takes longer
+than --budget seconds on top of the Streamlit import, or if any heavy module (Google
+clients, pandas, the functional modules) was imported before anyone logged in.
+Exits with status 1 when over budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Must not be imported by the logged-out page
+HEAVY_MODULES = [
+    "pandas", "gspread", "google.auth", "google.oauth2", "googleapiclient",
+    "google_sheet_utils", "google_drive_utils", "frame_utils", "fake_sheets", "modules",
+]
+
+# Runs in the fresh interpreter, prints one JSON line
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+streamlit_seconds = time.perf_counter() - started
+baseline = set(sys.modules)
+started = time.perf_counter()
+app = AppTest.from_file({main!r}, default_timeout=60)
+app.run()
+render_seconds = time.perf_counter() - started
+loaded = [name for name in {heavy!r}
+          if any(m == name or m.startswith(name + ".") for m in set(sys.modules) - baseline)]
+print(json.dumps({{
+    "streamlit_seconds": streamlit_seconds,
+    "render_seconds": render_seconds,
+    "heavy_modules": loaded,
+    "exception": [str(e.message) for e in app.exception] or None,
+}}))
+"""
+
+
+def probe():
+    code = _PROBE.format(main=os.path.join(ROOT_DIR, "main.py"), heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=1.5, help="Seconds allowed for the first render")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    runs = [probe() for _ in range(args.runs)]
+    render_p50 = statistics.median(run["render_seconds"] for run in runs)
+    heavy = sorted({name for run in runs for name in run["heavy_modules"]})
+    errors = [run["exception"] for run in runs if run["exception"]]
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "budget_seconds": args.budget,
+        "streamlit_import_p50_seconds": statistics.median(run["streamlit_seconds"] for run in runs),
+        "render_p50_seconds": render_p50,
+        "heavy_modules": heavy,
+        "errors": errors,
+        "within_budget": render_p50 <= args.budget and not heavy and not errors,
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main()["within_budget"] else 1)
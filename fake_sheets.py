@@ -0,0 +1,374 @@
+# fake_sheets.py
+"""In-process stand-in for the gspread client, for benchmarks and local runs without credentials
+
+Implements the part of the gspread Client/Spreadsheet/Worksheet surface this repo uses,
+with configurable per-call latency, injected 429 errors and call/byte counters.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+
+import gspread
+import requests
+from gspread.cell import Cell
+from gspread.utils import a1_range_to_grid_range, a1_to_rowcol, numericise_all
+
+
+def _quota_error(retry_after=1):
+    """gspread.exceptions.APIError shaped like Google's 429 response"""
+    response = requests.Response()
+    response.status_code = 429
+    response.headers["Retry-After"] = str(retry_after)
+    response._content = json.dumps({
+        "error": {"code": 429, "message": "Quota exceeded (fake)", "status": "RESOURCE_EXHAUSTED"}
+    }).encode()
+    return gspread.exceptions.APIError(response)
+
+
+def _grid_error(message):
+    """gspread.exceptions.APIError shaped like Google's 400 for writes past the grid"""
+    response = requests.Response()
+    response.status_code = 400
+    response._content = json.dumps({
+        "error": {"code": 400, "message": message, "status": "INVALID_ARGUMENT"}
+    }).encode()
+    return gspread.exceptions.APIError(response)
+
+
+def _payload_size(values):
+    return len(json.dumps(values)) if values is not None else 0
+
+
+class FakeClient:
+    """Replacement for gspread.Client holding spreadsheets in memory"""
+    def __init__(self, latency=0.0, error_rate=0.0, quota_per_minute=None, auto_create=True, seed=None):
+        self.latency = latency  # Seconds added to every API call
+        self.error_rate = error_rate  # Probability that a call fails with 429
+        self.quota_per_minute = quota_per_minute  # Calls allowed in any 60 s window (None = unlimited)
+        self.auto_create = auto_create  # open() creates missing spreadsheets
+        self.calls = Counter()  # Format: {method_name: count}
+        self.errors = Counter()  # Injected 429s per method
+        self.bytes_transferred = 0
+        self.spreadsheets = {}
+        self.drive = FakeDrive(self)  # Pass as GoogleSheetHandler(drive=...) for change detection
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent_calls = deque()
+
+    def _api_call(self, name, values=None):
+        """Account for one API request, then apply latency and fault injection"""
+        with self._lock:
+            now = time.monotonic()
+            self.calls[name] += 1
+            self.bytes_transferred += _payload_size(values)
+            while self._recent_calls and now - self._recent_calls[0] > 60:
+                self._recent_calls.popleft()
+            over_quota = self.quota_per_minute is not None and len(self._recent_calls) >= self.quota_per_minute
+            inject = over_quota or (self.error_rate and self._random.random() < self.error_rate)
+            if not inject:
+                self._recent_calls.append(now)
+            else:
+                self.errors[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if inject:
+            raise _quota_error()
+
+    def _count_bytes(self, values):
+        with self._lock:
+            self.bytes_transferred += _payload_size(values)
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = Counter()
+            self.errors = Counter()
+            self.bytes_transferred = 0
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def create(self, title):
+        spreadsheet = FakeSpreadsheet(self, title)
+        self.spreadsheets[title] = spreadsheet
+        return spreadsheet
+
+    def open(self, title):
+        self._api_call("open")
+        if title not in self.spreadsheets:
+            if not self.auto_create:
+                raise gspread.SpreadsheetNotFound(title)
+            self.create(title)
+        return self.spreadsheets[title]
+
+
+class FakeDrive:
+    """Stand-in for the Drive metadata lookup GoogleSheetHandler uses for change detection"""
+    def __init__(self, client):
+        self.client = client
+
+    def get_modified_time(self, file_id):
+        self.client._api_call("files.get")
+        for spreadsheet in self.client.spreadsheets.values():
+            if spreadsheet.id == file_id:
+                return spreadsheet.modified_time.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        return None
+
+
+class FakeSpreadsheet:
+    """Replacement for gspread.Spreadsheet"""
+    def __init__(self, client, title):
+        self.client = client
+        self.title = title
+        self.id = uuid.uuid4().hex
+        self._worksheets = {}
+        self._next_sheet_id = 0
+        self.modified_time = datetime.now(timezone.utc)
+
+    def touch(self):
+        """Bump the Drive modifiedTime, like any edit to the real spreadsheet does"""
+        # Reported at millisecond precision, so keep consecutive edits distinguishable
+        self.modified_time = max(datetime.now(timezone.utc), self.modified_time + timedelta(milliseconds=1))
+
+    def seed_worksheet(self, title, rows):
+        """Create or replace a worksheet with data, without counting API calls"""
+        worksheet = self._worksheets.get(title) or self._new_worksheet(title)
+        worksheet._rows = [[str(v) for v in row] for row in rows]
+        # Grid of a sheet made in the Sheets UI, grown to fit the data
+        worksheet.row_count = max(len(worksheet._rows), 1000)
+        worksheet.col_count = max(worksheet._width(), 26)
+        self.touch()
+        return worksheet
+
+    def _new_worksheet(self, title, rows=1000, cols=26):
+        worksheet = FakeWorksheet(self, title, self._next_sheet_id, rows, cols)
+        self._next_sheet_id += 1
+        self._worksheets[title] = worksheet
+        return worksheet
+
+    def worksheet(self, title):
+        self.client._api_call("worksheet")
+        if title not in self._worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def worksheets(self):
+        self.client._api_call("worksheets")
+        return list(self._worksheets.values())
+
+    def add_worksheet(self, title, rows=1000, cols=26, **kwargs):
+        self.client._api_call("add_worksheet")
+        self.touch()
+        return self._new_worksheet(title, int(rows), int(cols))
+
+    def del_worksheet(self, worksheet):
+        self.client._api_call("del_worksheet")
+        self._worksheets.pop(worksheet.title, None)
+        self.touch()
+
+    def values_batch_get(self, ranges, params=None):
+        """Several "'Sheet'!A1:B2" (or whole-sheet "'Sheet'") ranges in one request"""
+        value_ranges = []
+        for range_name in ranges:
+            title, _, a1 = range_name.partition("!")
+            if title.startswith("'") and title.endswith("'"):
+                title = title[1:-1].replace("''", "'")
+            if title not in self._worksheets:
+                raise gspread.exceptions.WorksheetNotFound(title)
+            values = self._worksheets[title]._range_values(a1 or None)
+            if (params or {}).get("majorDimension") == "COLUMNS":
+                width = max((len(row) for row in values), default=0)
+                values = [[row[i] if i < len(row) else "" for row in values] for i in range(width)]
+                for column in values:
+                    while column and column[-1] == "":
+                        column.pop()
+            value_ranges.append({"range": range_name, "values": values} if values else {"range": range_name})
+        self.client._api_call("values_batch_get")
+        self.client._count_bytes([vr.get("values") for vr in value_ranges])
+        return {"valueRanges": value_ranges}
+
+    def batch_update(self, body):
+        """Supports deleteDimension on ROWS and appendDimension, applied in request order like the real API"""
+        self.client._api_call("batch_update", body)
+        by_id = {ws.id: ws for ws in self._worksheets.values()}
+        for request in body.get("requests", []):
+            if "appendDimension" in request:
+                append = request["appendDimension"]
+                worksheet = by_id[append["sheetId"]]
+                if append["dimension"] == "ROWS":
+                    worksheet.row_count += append["length"]
+                else:
+                    worksheet.col_count += append["length"]
+                continue
+            if "deleteDimension" not in request:
+                raise NotImplementedError(f"Fake batch_update does not support {list(request)}")
+            grid = request["deleteDimension"]["range"]
+            if grid.get("dimension") != "ROWS":
+                raise NotImplementedError("Fake batch_update only deletes rows")
+            worksheet = by_id[grid["sheetId"]]
+            del worksheet._rows[grid["startIndex"]:grid["endIndex"]]
+            worksheet.row_count -= grid["endIndex"] - grid["startIndex"]
+        self.touch()
+        return {"replies": []}
+
+
+class FakeWorksheet:
+    """Replacement for gspread.Worksheet (values only, no formatting)
+
+    The grid size is enforced like the real API: updates past row_count/col_count fail with
+    400, appends grow the grid.
+    """
+    def __init__(self, spreadsheet, title, sheet_id, rows=1000, cols=26):
+        self.spreadsheet = spreadsheet
+        self.client = spreadsheet.client
+        self.title = title
+        self.id = sheet_id
+        self.row_count = rows
+        self.col_count = cols
+        self._rows = []
+
+    # ---------------------- Helpers ----------------------
+    def _width(self):
+        return max((len(row) for row in self._rows), default=0)
+
+    def _padded(self, rows):
+        width = max((len(row) for row in rows), default=0)
+        return [list(row) + [""] * (width - len(row)) for row in rows]
+
+    def _trimmed_rows(self):
+        rows = list(self._rows)
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return rows
+
+    def _check_grid(self, start_row, start_col, values):
+        end_row = start_row - 1 + len(values)
+        end_col = start_col - 1 + max((len(row) for row in values), default=0)
+        if end_row > self.row_count or end_col > self.col_count:
+            raise _grid_error(
+                f"Range ('{self.title}'!{gspread.utils.rowcol_to_a1(end_row, end_col)}) exceeds grid limits. "
+                f"Max rows: {self.row_count}, max columns: {self.col_count}"
+            )
+
+    def _grow_grid(self, values):
+        """Appends add the rows and columns they need"""
+        self.row_count = max(self.row_count, len(self._rows))
+        self.col_count = max(self.col_count, max((len(row) for row in values), default=0))
+
+    def _write(self, start_row, start_col, values):
+        self._check_grid(start_row, start_col, values)
+        for offset, new_values in enumerate(values):
+            row_idx = start_row - 1 + offset
+            while len(self._rows) <= row_idx:
+                self._rows.append([])
+            row = self._rows[row_idx]
+            end_col = start_col - 1 + len(new_values)
+            if len(row) < end_col:
+                row.extend([""] * (end_col - len(row)))
+            row[start_col - 1:end_col] = ["" if v is None else str(v) for v in new_values]
+        self.spreadsheet.touch()
+
+    # ---------------------- gspread surface ----------------------
+    def get_all_values(self, **kwargs):
+        values = self._padded(self._trimmed_rows())
+        self.client._api_call("get_all_values")
+        self.client._count_bytes(values)
+        return values
+
+    def get_all_records(self, **kwargs):
+        values = self.get_all_values()
+        if not values:
+            return []
+        header = values[0]
+        return [dict(zip(header, numericise_all(row, default_blank=""))) for row in values[1:]]
+
+    def _range_values(self, range_name):
+        """Values of one A1 range (None = whole sheet), trimmed like the API"""
+        grid = a1_range_to_grid_range(range_name) if range_name else {}
+        rows = self._trimmed_rows()
+        end_row = grid.get("endRowIndex", len(rows))
+        start_col, end_col = grid.get("startColumnIndex", 0), grid.get("endColumnIndex")
+        values = []
+        for row in rows[grid.get("startRowIndex", 0):end_row]:
+            cells = list(row[start_col:end_col])
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def batch_get(self, ranges, **kwargs):
+        """values_batch_get of ranges on this worksheet"""
+        response = self.spreadsheet.values_batch_get(
+            [gspread.utils.absolute_range_name(self.title, range_name) for range_name in ranges]
+        )
+        return [value_range.get("values", []) for value_range in response["valueRanges"]]
+
+    def row_values(self, row, **kwargs):
+        self.client._api_call("row_values")
+        values = list(self._rows[row - 1]) if 0 < row <= len(self._rows) else []
+        while values and values[-1] == "":
+            values.pop()
+        self.client._count_bytes(values)
+        return values
+
+    def find(self, query, **kwargs):
+        self.client._api_call("find")
+        for row_idx, row in enumerate(self._rows, start=1):
+            for col_idx, value in enumerate(row, start=1):
+                if value == str(query):
+                    return Cell(row_idx, col_idx, value)
+        return None
+
+    def append_row(self, values, **kwargs):
+        self.client._api_call("append_row", values)
+        self._rows = self._trimmed_rows()
+        self._rows.append(["" if v is None else str(v) for v in values])
+        self._grow_grid([values])
+        self.spreadsheet.touch()
+
+    def append_rows(self, values, **kwargs):
+        self.client._api_call("append_rows", values)
+        self._rows = self._trimmed_rows()
+        self._rows.extend(["" if v is None else str(v) for v in row] for row in values)
+        self._grow_grid(values)
+        self.spreadsheet.touch()
+
+    def update(self, values=None, range_name=None, **kwargs):
+        # Accept both argument orders (gspread 5 was update(range_name, values))
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        self.client._api_call("update", values)
+        start_row, start_col = a1_to_rowcol((range_name or "A1").split(":")[0])
+        self._write(start_row, start_col, values)
+
+    def update_cell(self, row, col, value):
+        self.client._api_call("update_cell", [[value]])
+        self._write(row, col, [[value]])
+
+    def batch_update(self, data, **kwargs):
+        """values_batch_update: several ranges in one request"""
+        self.client._api_call("values_batch_update", [d["values"] for d in data])
+        # The whole request is rejected if any range is past the grid
+        for item in data:
+            self._check_grid(*a1_to_rowcol(item["range"].split(":")[0]), item["values"])
+        for item in data:
+            start_row, start_col = a1_to_rowcol(item["range"].split(":")[0])
+            self._write(start_row, start_col, item["values"])
+
+    def delete_rows(self, start_index, end_index=None):
+        self.client._api_call("delete_rows")
+        end_index = end_index or start_index
+        del self._rows[start_index - 1:end_index]
+        self.row_count -= end_index - start_index + 1
+        self.spreadsheet.touch()
+
+    def clear(self):
+        self.client._api_call("clear")
+        self._rows = []
+        self.spreadsheet.touch()
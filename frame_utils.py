@@ -0,0 +1,58 @@
+# frame_utils.py
+"""Typed pandas DataFrames over worksheet snapshots
+
+Every worksheet with a declared schema is parsed column-wise (vectorized) instead of
+row by row, and backends that cache snapshots keep the parsed frame per snapshot version.
+"""
+import pandas as pd
+
+# Column types per worksheet; undeclared columns stay strings.
+# int: blank, invalid or fractional -> <NA>, float: blank or invalid -> NaN,
+# bool: "TRUE" (any case) -> True, else False, date/datetime: invalid -> NaT
+FRAME_SCHEMAS = {
+    "users": {"register_time": "datetime", "last_login": "datetime"},
+    "Attendance": {"member_id": "int", "meeting_id": "int", "is_present": "bool", "updated_at": "datetime"},
+    # AllGroupsData has no schema: the groups page shows dates and amounts as entered
+    "Calendar": {"date": "date"},
+    "MoneyTransfers": {"date": "date", "amount": "float"},
+}
+
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _convert(column, kind):
+    if kind == "int":
+        # Fractional values are invalid too (astype would raise on them)
+        numbers = pd.to_numeric(column, errors="coerce")
+        return numbers.where(numbers.mod(1).eq(0)).astype("Int64")
+    if kind == "float":
+        return pd.to_numeric(column, errors="coerce")
+    if kind == "bool":
+        return column.str.lower().eq("true")
+    if kind == "date":
+        return pd.to_datetime(column, format=DATE_FORMAT, errors="coerce")
+    if kind == "datetime":
+        return pd.to_datetime(column, format=DATETIME_FORMAT, errors="coerce")
+    return column
+
+
+def frame_from_values(worksheet_title, rows, schema=None):
+    """DataFrame of rows (header first) typed by FRAME_SCHEMAS[worksheet_title] or schema
+
+    Index is the 0-based data row, so the sheet row number is index + 2.
+    """
+    if not rows:
+        return pd.DataFrame()
+    header = list(rows[0])
+    width = len(header)
+    frame = pd.DataFrame(
+        [list(row[:width]) + [""] * (width - len(row)) for row in rows[1:]],
+        columns=header,
+        dtype=object
+    )
+    schema = FRAME_SCHEMAS.get(worksheet_title, {}) if schema is None else schema
+    for column, kind in schema.items():
+        if column in frame.columns:
+            frame[column] = _convert(frame[column].fillna("").astype(str), kind)
+    return frame
@@ -5,6 +5,8 @@ from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
 from googleapiclient.errors import HttpError
 from io import BytesIO  # 新增：处理文件流
+import time
+from api_metrics import api_metrics
 
 class GoogleDriveHandler:
     def __init__(self, credentials):
@@ -13,6 +15,27 @@ class GoogleDriveHandler:
         # 确保此处是你共享文件夹的正确ID（从个人Drive地址栏复制）
         self.folder_id = "1NDgg27Q_XIn0p7XVBKg_uxaGwqRgdpqY"
 
+    def _execute(self, request, operation):
+        """执行API请求并记录调用次数/耗时（按模块和操作类型统计）"""
+        started = time.monotonic()
+        try:
+            result = request.execute()
+        except HttpError as e:
+            quota_errors = 1 if e.resp.status == 429 else 0
+            api_metrics.record("drive", operation, time.monotonic() - started, quota_errors=quota_errors, failed=True)
+            raise
+        api_metrics.record("drive", operation, time.monotonic() - started)
+        return result
+
+    def get_modified_time(self, file_id):
+        """读取文件的modifiedTime（RFC 3339字符串），只请求这一个字段，用于判断表格是否有改动"""
+        file = self._execute(self.service.files().get(
+            fileId=file_id,
+            fields='modifiedTime',
+            supportsAllDrives=True
+        ), "read")
+        return file.get('modifiedTime')
+
     def upload_image(self, image_file, group_code):
         """上传图片到个人共享文件夹（核心修正版）"""
         filename = f"{group_code}-receipt-{image_file.name}"
@@ -30,19 +53,19 @@ class GoogleDriveHandler:
         )
         try:
             # 3. 确保API调用支持个人Drive
-            file = self.service.files().create(
+            file = self._execute(self.service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id',
                 supportsAllDrives=False  # 个人Drive无需启用共享驱动器支持
-            ).execute()
+            ), "append")
             
             # 4. 简化权限设置（仅允许读取，避免权限过高导致的问题）
-            self.service.permissions().create(
+            self._execute(self.service.permissions().create(
                 fileId=file['id'],
                 body={'role': 'reader', 'type': 'anyone'},
                 supportsAllDrives=False
-            ).execute()
+            ), "update")
             
             return f"https://drive.google.com/uc?export=view&id={file['id']}"
         except HttpError as e:
@@ -1,23 +1,418 @@
 import gspread
 from google.oauth2.service_account import Credentials
 import streamlit as st
+from google.auth.transport.requests import Request
 import os
+import json
+import sqlite3
 import time
+import threading
+from collections import OrderedDict, deque
+from itertools import count
 from datetime import datetime, timedelta
 from googleapiclient.errors import HttpError  # New: Handle API errors
+from storage_utils import StorageBackend, TABLE_SCHEMAS, column_letter, select_columns
+from api_metrics import api_metrics
 
-class GoogleSheetHandler:
-    """Google Sheets operation utility class with quota optimization"""
-    def __init__(self, credentials_path, scope=None):
+# Service account key used when neither Streamlit Secrets nor credentials_path provide one
+DEFAULT_CREDENTIALS_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), "credentials.json")
+
+
+class SheetDataCache:
+    """Process-wide worksheet snapshot cache (TTL + LRU eviction under a memory cap)
+
+    Keys extending another key's tuple (e.g. column projections of a worksheet) are derived
+    from it and dropped whenever that snapshot is replaced, patched or invalidated.
+    Each snapshot carries a version (new on every put/patch) so parsed forms of it, such as
+    typed DataFrames, can be kept next to it and rebuilt only when the rows change.
+    """
+    def __init__(self, ttl=timedelta(minutes=5), max_bytes=64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Format: {key: {"data": rows, "expire_time": datetime, "size": bytes,
+        #                "revision": spreadsheet modifiedTime or None, "fetched_at": datetime,
+        #                "version": int}}
+        self._entries = OrderedDict()
+        self._frames = {}  # Format: {key: (version, parsed snapshot)}
+        self._versions = count(1)
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0  # Expired snapshots confirmed unchanged by a revision check
+        self.evictions = 0
+
+    @staticmethod
+    def _estimate_size(data):
+        """Rough memory footprint of a list of rows (string cells + per-row overhead)"""
+        return sum(64 + sum(len(str(cell)) + 50 for cell in row) for row in data)
+
+    def _lifetime(self, ttl):
+        """ttl (timedelta or seconds) of one entry; only None means the default, 0 expires at once"""
+        if ttl is None:
+            return self.ttl
+        return ttl if isinstance(ttl, timedelta) else timedelta(seconds=ttl)
+
+    def get(self, key):
+        """Return cached rows or None; counts hits and misses"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or datetime.now() >= entry["expire_time"]:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Copy the outer list so callers can't reorder the shared snapshot
+            return list(entry["data"])
+
+    def peek(self, key):
+        """Like get() but without counting (for opportunistic lookups)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or datetime.now() >= entry["expire_time"]:
+                return None
+            return list(entry["data"])
+
+    def get_stale(self, key):
+        """(rows, revision, fetched_at) of a snapshot even if expired, or None (not counted)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return list(entry["data"]), entry["revision"], entry["fetched_at"]
+
+    def revalidate(self, key, revision, ttl=None):
+        """Mark an expired snapshot as current again (the preceding get() is not a miss after all)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry["revision"] = revision
+            entry["expire_time"] = datetime.now() + self._lifetime(ttl)
+            self._entries.move_to_end(key)
+            self.misses -= 1
+            self.revalidations += 1
+
+    def put(self, key, data, revision=None, ttl=None, fetched_at=None):
+        """Store a fresh snapshot, evicting least recently used entries over the cap
+
+        fetched_at is kept from the previous snapshot when only part of it was re-read
+        (delta sync), so the TTL still bounds the age of the oldest downloaded rows.
+        """
+        data = [list(row) for row in data]
+        size = self._estimate_size(data)
+        with self._lock:
+            self._remove(key)
+            self._remove_derived(key)
+            if size > self.max_bytes:
+                return
+            now = datetime.now()
+            self._entries[key] = {
+                "data": data, "expire_time": now + self._lifetime(ttl), "size": size,
+                "revision": revision, "fetched_at": fetched_at or now, "version": next(self._versions)
+            }
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def patch(self, key, func):
+        """Apply func(rows) to a cached snapshot in place (write-through), no-op if not cached"""
+        with self._lock:
+            self._remove_derived(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            try:
+                func(entry["data"])
+            except Exception:
+                # Unknown shape after a failed patch, force a reload instead
+                self._remove(key)
+                return
+            new_size = self._estimate_size(entry["data"])
+            self._total_bytes += new_size - entry["size"]
+            entry["size"] = new_size
+            entry["version"] = next(self._versions)
+
+    def frame(self, key, build):
+        """build(rows) of a cached snapshot, computed once per snapshot version (None if not cached)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached = self._frames.get(key)
+            if cached is not None and cached[0] == entry["version"]:
+                return cached[1]
+            version, rows = entry["version"], list(entry["data"])
+        frame = build(rows)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["version"] == version:
+                self._frames[key] = (version, frame)
+        return frame
+
+    def invalidate(self, key=None):
+        """Drop one snapshot (or all of them)"""
+        with self._lock:
+            if key is None:
+                self._entries = OrderedDict()
+                self._frames = {}
+                self._total_bytes = 0
+            else:
+                self._remove(key)
+                self._remove_derived(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        self._frames.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry["size"]
+
+    def _remove_derived(self, key):
+        size = len(key)
+        for derived in [k for k in self._entries if len(k) > size and k[:size] == key]:
+            self._remove(derived)
+
+    def stats(self):
+        """Hit/miss counters and memory usage"""
+        with self._lock:
+            total = self.hits + self.revalidations + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": ((self.hits + self.revalidations) / total) if total else 0.0
+            }
+
+
+class SnapshotStore:
+    """Last downloaded snapshot of each worksheet on disk (SQLite), so a restarted process can
+    serve pages immediately and revalidate in the background. Saves go through a writer thread."""
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # key: JSON of the cache key, (spreadsheet_id, worksheet_id[, columns])
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots (key TEXT PRIMARY KEY, revision TEXT, saved_at TEXT, data TEXT)"
+        )
+        self._conn.commit()
+        self._pending = {}  # Format: {key: (rows, revision)}, latest save per worksheet wins
+        self._wakeup = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def load(self, key):
+        """(rows, revision) saved for key, or None"""
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                return [list(row) for row in pending[0]], pending[1]
+            row = self._conn.execute(
+                "SELECT data, revision FROM snapshots WHERE key = ?", (json.dumps(key),)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            return None
+
+    def save(self, key, rows, revision):
+        with self._lock:
+            self._pending[key] = (list(rows), revision)
+        self._wakeup.set()
+
+    def _write_loop(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for key, (rows, revision) in pending.items():
+                try:
+                    data = json.dumps(rows)
+                    with self._lock:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                            (json.dumps(key), revision, datetime.now().isoformat(), data)
+                        )
+                        self._conn.commit()
+                except (sqlite3.Error, TypeError, ValueError):
+                    pass  # The disk copy is only an optimization for cold starts
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would wait longer than the limiter allows (shed before Google rejects it)"""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at capacity tokens per period"""
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period  # Tokens per second
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until one token is available"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        # May go negative: later callers queue behind earlier reservations
+        self.tokens -= 1
+
+    def drain(self, now, seconds):
+        """Empty the bucket so the next token is only available after `seconds` (used after a 429)"""
+        self._refill(now)
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class SheetsRateLimiter:
+    """Process-wide limiter modelling Google Sheets per-minute read/write quotas"""
+    # Sheets API defaults: 300 requests/min per project, 60 requests/min per user (the service account)
+    DEFAULT_QUOTAS = {
+        "read": {"per_user": 60, "per_project": 300},
+        "write": {"per_user": 60, "per_project": 300},
+    }
+
+    def __init__(self, quotas=None, max_wait=8.0):
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._buckets = {
+            kind: {scope: TokenBucket(limit) for scope, limit in limits.items()}
+            for kind, limits in (quotas or self.DEFAULT_QUOTAS).items()
+        }
+        self.throttled = 0  # Requests that had to wait
+        self.shed = 0  # Requests rejected locally
+
+    def acquire(self, kind):
+        """Reserve one request of `kind`, sleeping until it fits the quota or shedding it"""
+        with self._lock:
+            now = time.monotonic()
+            buckets = self._buckets[kind].values()
+            wait = max(bucket.wait_time(now) for bucket in buckets)
+            if wait > self.max_wait:
+                self.shed += 1
+                raise RateLimitExceeded(
+                    f"Google Sheets {kind} quota is used up, please try again in {wait:.0f} seconds"
+                )
+            for bucket in buckets:
+                bucket.take()
+            if wait > 0:
+                self.throttled += 1
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self, kind, retry_after):
+        """Google returned 429: hold back every session until retry_after has passed"""
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self._buckets[kind].values():
+                bucket.drain(now, retry_after)
+
+    def budget(self):
+        """Requests currently available per kind and quota scope"""
+        with self._lock:
+            now = time.monotonic()
+            result = {}
+            for kind, buckets in self._buckets.items():
+                for bucket in buckets.values():
+                    bucket._refill(now)
+                result[kind] = {scope: max(0, int(bucket.tokens)) for scope, bucket in buckets.items()}
+            result["throttled"] = self.throttled
+            result["shed"] = self.shed
+            return result
+
+
+# Shared by every handler in this server process
+_sheet_data_cache = SheetDataCache()
+_rate_limiter = SheetsRateLimiter()
+
+# Metrics operation of each gspread method (anything not listed is a "read")
+_OPERATIONS = {
+    "append_row": "append", "append_rows": "append", "values_append": "append", "add_worksheet": "append",
+    "update": "update", "update_cell": "update", "update_cells": "update", "values_update": "update",
+    "values_batch_update": "update", "clear": "update", "values_clear": "update", "add_cols": "update",
+    "delete_rows": "delete", "del_worksheet": "delete",
+    "find": "find",
+}
+
+# Append-mostly worksheets refreshed by fetching only the rows added since the cached snapshot.
+# Value: column compared in full to detect edits (None = only the last cached row is verified)
+DELTA_SYNC_SHEETS = {
+    "Attendance": "updated_at",
+    "MoneyTransfers": None,
+    "AllGroupsData": None,
+}
+
+# Worksheet/Spreadsheet methods that count against the write quota (everything else is a read)
+_WRITE_CALLS = {
+    "append_row", "append_rows", "update", "update_cell", "update_cells", "batch_update",
+    "delete_rows", "clear", "add_worksheet", "del_worksheet", "values_update",
+    "values_append", "values_batch_update", "values_clear", "add_cols"
+}
+
+
+class GoogleSheetHandler(StorageBackend):
+    """Google Sheets operation utility class with quota optimization (the "sheets" storage backend)"""
+    def __init__(self, credentials_path, scope=None, client=None, cache=None, rate_limiter=None, drive=None,
+                 snapshot_store=None):
+        """client/cache/rate_limiter/drive can be injected (e.g. fake_sheets.FakeClient for benchmarks)"""
         self.credentials_path = credentials_path
         self.scope = scope or [
             "https://www.googleapis.com/auth/spreadsheets",
             "https://www.googleapis.com/auth/drive"
         ]
-        self.client = self._authorize()
-        # New: Caching mechanism (5-minute default validity)
-        self.cache = {}  # Format: {(spreadsheet_name, worksheet_name): (data, expire_time)}
-        self.cache_ttl = timedelta(minutes=5)
+        # Token refresh is serialized so concurrent sessions don't all refresh at once
+        self._auth_lock = threading.Lock()
+        self.creds = None
+        self.client = client if client is not None else self._authorize()
+        # Handle cache so opening a spreadsheet/worksheet costs metadata requests only once per process
+        self._handle_lock = threading.Lock()
+        self._spreadsheets = {}  # Format: {spreadsheet_name: Spreadsheet}
+        self._worksheets = {}  # Format: {(spreadsheet_name, worksheet_name): Worksheet}
+        self._column_counts = {}  # Format: {cache_key: grid columns}, as grown by this process
+        # New: Caching mechanism (5-minute default validity, shared across sessions)
+        self.cache = cache or _sheet_data_cache
+        self.rate_limiter = rate_limiter or _rate_limiter
+        # Write-behind queue: {cache_key: {"worksheet": Worksheet, "ops": deque}}, flushed in FIFO order
+        self._write_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending_writes = OrderedDict()
+        self._write_errors = {}  # Format: {session_id: [error message]}
+        # Format: {cache_key: [error message]}, failed writes no session queued (e.g. timer threads)
+        self._worksheet_write_errors = {}
+        self.max_write_errors = 20  # Messages kept per session or worksheet; older ones are dropped
+        self._flush_timer = None
+        self.write_flush_delay = 2.0  # Seconds before queued writes are flushed automatically
+        # Change detection: one Drive modifiedTime lookup per spreadsheet replaces full re-downloads
+        self._drive = drive  # Built lazily from self.creds when not injected
+        self._revision_lock = threading.Lock()
+        self._revisions = {}  # Format: {spreadsheet_id: (modifiedTime, monotonic time checked)}
+        self._revision_lookups = {}  # Format: {spreadsheet_id: Lock}, one Drive lookup in flight per spreadsheet
+        self.revision_check_interval = 10.0  # Seconds a snapshot (and a modifiedTime) is trusted unchecked
+        self.delta_sync = dict(DELTA_SYNC_SHEETS)  # Format: {worksheet_title: watermark column or None}
+        # Cold start: snapshots saved by the previous process are served, then revalidated
+        self.snapshot_store = snapshot_store
+        self._restore_checked = set()  # Cache keys looked up on disk already (once per process)
+        self._unverified = set()  # Cache keys serving a restored snapshot not checked against Drive yet
+        self._verify_locks = {}  # Format: {cache_key: Lock}, one check in flight per restored snapshot
+        # Key column → row number indexes over cached snapshots (worksheets with a schema "key")
+        self._index_lock = threading.Lock()
+        self._row_indexes = {}  # Format: {cache_key: {"column": idx, "length": rows, "rows": {value: row}}}
 
     def _authorize(self):
         """Authentication logic: prioritize using Streamlit Secrets"""
@@ -25,136 +420,979 @@ class GoogleSheetHandler:
             if "google_credentials" in st.secrets:
                 creds_dict = st.secrets["google_credentials"]
                 creds = Credentials.from_service_account_info(creds_dict, scopes=self.scope)
-            elif self.credentials_path and os.path.exists(self.credentials_path):
-                creds = Credentials.from_service_account_file(self.credentials_path, scopes=self.scope)
+            elif os.path.exists(self.credentials_path or DEFAULT_CREDENTIALS_PATH):
+                # Every caller passes "" so all sessions share one handler; the bundled file is the fallback
+                creds = Credentials.from_service_account_file(
+                    self.credentials_path or DEFAULT_CREDENTIALS_PATH, scopes=self.scope
+                )
             else:
                 raise FileNotFoundError("No valid Google credentials found")
             
+            self.creds = creds
             return gspread.authorize(creds)
         
         except Exception as e:
             st.error(f"Credential error: {str(e)}")
             raise
 
+    def _ensure_token(self):
+        """Refresh the shared access token centrally before it expires"""
+        if self.creds is None or self.creds.valid:
+            return
+        with self._auth_lock:
+            # Another session may have refreshed while we waited for the lock
+            if not self.creds.valid:
+                self.creds.refresh(Request())
+
+    @staticmethod
+    def _retry_after(e, default):
+        """Seconds Google asked us to wait, from the Retry-After header if present"""
+        try:
+            headers = e.resp if isinstance(e, HttpError) else e.response.headers
+            return float(headers.get("retry-after", default))
+        except Exception:
+            return default
+
+    @staticmethod
+    def _operation_for(func):
+        """Metrics operation: read/append/update/delete/find"""
+        name = getattr(func, "__name__", "")
+        if name == "batch_update":
+            # Spreadsheet.batch_update only carries deleteDimension requests here,
+            # Worksheet.batch_update is a values_batch_update
+            return "delete" if hasattr(getattr(func, "__self__", None), "worksheets") else "update"
+        return _OPERATIONS.get(name, "read")
+
     # New: Request retry decorator (core optimization)
     def _retry_with_backoff(self, func, *args, **kwargs):
-        """Retry mechanism with exponential backoff for handling 429 quota exceeded errors"""
+        """Rate-limited, instrumented call; a 429 drains the shared quota budget and the call is retried"""
+        kind = "write" if getattr(func, "__name__", "") in _WRITE_CALLS else "read"
         max_retries = 3
-        retry_delay = 5  # Initial delay of 5 seconds
+        retry_delay = 5  # Fallback delay when Google sends no Retry-After
+        quota_errors = 0
+        started = time.monotonic()
         for attempt in range(max_retries):
             try:
-                return func(*args, **kwargs)
-            except HttpError as e:
-                if e.resp.status == 429:  # Quota exceeded
-                    if attempt < max_retries - 1:
-                        st.warning(f"Requests too frequent, retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff (5→10→20 seconds)
-                        continue
-                    else:
-                        raise Exception(f"Exceeded maximum retry attempts: {str(e)}")
-                else:
+                self.rate_limiter.acquire(kind)
+                self._ensure_token()
+                result = func(*args, **kwargs)
+            except (HttpError, gspread.exceptions.APIError) as e:
+                # Compatible with both googleapiclient and gspread-wrapped API errors
+                status = e.resp.status if isinstance(e, HttpError) else getattr(e.response, "status_code", None)
+                if status != 429 and "429" not in str(e):
+                    self._record_call(func, started, attempt, quota_errors, failed=True)
                     raise  # Directly raise other HTTP errors
-            except gspread.exceptions.APIError as e:
-                # Compatible with gspread-wrapped API errors
-                if "429" in str(e):
-                    if attempt < max_retries - 1:
-                        st.warning(f"Requests too frequent, retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
-                    else:
-                        raise Exception(f"Exceeded maximum retry attempts: {str(e)}")
-                else:
-                    raise
-            except Exception as e:
-                raise  # Directly raise non-API errors
+                quota_errors += 1
+                if attempt == max_retries - 1:
+                    self._record_call(func, started, attempt, quota_errors, failed=True)
+                    raise Exception(f"Exceeded maximum retry attempts: {str(e)}")
+                # Every session waits for the same budget instead of retrying independently
+                self.rate_limiter.penalize(kind, self._retry_after(e, retry_delay))
+                retry_delay *= 2
+            except Exception:
+                self._record_call(func, started, attempt, quota_errors, failed=True)
+                raise
+            else:
+                self._record_call(func, started, attempt, quota_errors)
+                return result
+
+    def _record_call(self, func, started, retries, quota_errors, failed=False):
+        api_metrics.record(
+            "sheets", self._operation_for(func), time.monotonic() - started,
+            retries=retries, quota_errors=quota_errors, failed=failed
+        )
+
+    def get_spreadsheet(self, spreadsheet_name):
+        """Get spreadsheet handle (cached per process, with retry)"""
+        spreadsheet = self._spreadsheets.get(spreadsheet_name)
+        if spreadsheet is None:
+            spreadsheet = self._retry_with_backoff(self.client.open, spreadsheet_name)
+            with self._handle_lock:
+                self._spreadsheets[spreadsheet_name] = spreadsheet
+        return spreadsheet
 
     def get_worksheet(self, spreadsheet_name, worksheet_name):
-        """Get specified worksheet (with retry)"""
+        """Get specified worksheet (cached per process, with retry)"""
+        cache_key = (spreadsheet_name, worksheet_name)
+        worksheet = self._worksheets.get(cache_key)
+        if worksheet is not None:
+            self._report_worksheet_errors(worksheet)
+            return worksheet
         try:
             # Wrap core calls with retry mechanism
-            spreadsheet = self._retry_with_backoff(self.client.open, spreadsheet_name)
-            return self._retry_with_backoff(spreadsheet.worksheet, worksheet_name)
+            spreadsheet = self.get_spreadsheet(spreadsheet_name)
+            worksheet = self._retry_with_backoff(spreadsheet.worksheet, worksheet_name)
         except gspread.SpreadsheetNotFound:
             raise Exception(f"Spreadsheet not found: {spreadsheet_name}")
         except gspread.WorksheetNotFound:
             raise Exception(f"Worksheet not found: {worksheet_name}")
         except Exception as e:
             raise Exception(f"Failed to get worksheet: {str(e)}")
+        with self._handle_lock:
+            self._worksheets[cache_key] = worksheet
+        self._report_worksheet_errors(worksheet)
+        return worksheet
+
+    def create_worksheet(self, spreadsheet_name, worksheet_name, rows=1000, cols=20):
+        """Create a new worksheet and cache its handle"""
+        spreadsheet = self.get_spreadsheet(spreadsheet_name)
+        worksheet = self._retry_with_backoff(
+            spreadsheet.add_worksheet,
+            title=worksheet_name,
+            rows=str(rows),
+            cols=str(cols)
+        )
+        with self._handle_lock:
+            self._worksheets[(spreadsheet_name, worksheet_name)] = worksheet
+        return worksheet
+
+    def delete_worksheet(self, spreadsheet_name, worksheet_name):
+        """Delete a worksheet and drop its cached handle"""
+        worksheet = self.get_worksheet(spreadsheet_name, worksheet_name)
+        spreadsheet = self.get_spreadsheet(spreadsheet_name)
+        self._retry_with_backoff(spreadsheet.del_worksheet, worksheet)
+        self.invalidate_cache(worksheet)
+        self.invalidate_handles(spreadsheet_name, worksheet_name)
+
+    def invalidate_handles(self, spreadsheet_name=None, worksheet_name=None):
+        """Drop cached handles (all, one spreadsheet, or one worksheet)"""
+        with self._handle_lock:
+            if spreadsheet_name and worksheet_name:
+                self._worksheets.pop((spreadsheet_name, worksheet_name), None)
+            elif spreadsheet_name:
+                self._spreadsheets.pop(spreadsheet_name, None)
+                for key in [k for k in self._worksheets if k[0] == spreadsheet_name]:
+                    del self._worksheets[key]
+            else:
+                self._spreadsheets = {}
+                self._worksheets = {}
+
+    # ---------------------- Cached reads ----------------------
+    @staticmethod
+    def _cache_key(worksheet):
+        """Cache key for a worksheet handle (ids survive renames)"""
+        return (worksheet.spreadsheet.id, worksheet.id)
+
+    def get_all_values(self, worksheet, force=False):
+        """Get all cell values (read-through process cache, with retry)
+
+        Without a Drive client snapshots simply expire after the cache TTL. With one, a
+        snapshot is trusted for revision_check_interval seconds; after that a single
+        modifiedTime lookup (shared by all worksheets of the spreadsheet) decides whether
+        the snapshot is still current or has to be downloaded again. The cache TTL stays
+        the upper bound on how old a revalidated snapshot can get.
+        """
+        cache_key = self._cache_key(worksheet)
+        data, revision, stale = self._cached_snapshot(worksheet, cache_key, force)
+        if data is not None:
+            return data
+        if stale is not None:
+            data = self._delta_sync(worksheet, stale[0])
+            if data is not None:
+                self.cache.put(cache_key, data, revision=revision, ttl=self._snapshot_ttl(revision),
+                               fetched_at=stale[2])
+                self._save_snapshot(cache_key, data, revision)
+                return list(data)
+        data = self._retry_with_backoff(worksheet.get_all_values)
+        self.cache.put(cache_key, data, revision=revision, ttl=self._snapshot_ttl(revision))
+        self._save_snapshot(cache_key, data, revision)
+        return list(data)
+
+    def _cached_snapshot(self, worksheet, cache_key, force=False):
+        """(rows, revision, stale): rows when the cache can answer, otherwise None plus the
+        spreadsheet revision to store with the next download and the cached (rows, revision,
+        fetched_at) if it is young enough to be delta-synced
+
+        force=True always means a full download: a delta only sees appended rows and watermark
+        changes, not cells edited in place, which is what a manual refresh is for.
+        """
+        if not force:
+            data = self.cache.get(cache_key)
+            if data is None:
+                data = self._restore_snapshot(worksheet, cache_key)
+            if data is not None:
+                return data, None, None
+        else:
+            # Don't read back a sheet that is missing our own queued writes
+            self.flush_writes(worksheet)
+        revision = self._spreadsheet_revision(worksheet.spreadsheet)
+        stale = self.cache.get_stale(cache_key)
+        if force or stale is None or datetime.now() - stale[2] >= self.cache.ttl:
+            return None, revision, None
+        if self._is_current(stale[1], revision):
+            self.cache.revalidate(cache_key, revision, self._snapshot_ttl(revision))
+            return stale[0], revision, None
+        return None, revision, stale
+
+    def get_frame(self, worksheet, columns=None, force=False):
+        """Typed DataFrame of a worksheet (or of only the named columns), parsed once per snapshot
+
+        The frame is shared by every session reading the same snapshot: filter and copy it,
+        don't modify it in place.
+        """
+        from frame_utils import frame_from_values
+
+        def build(rows):
+            return frame_from_values(worksheet.title, rows)
+
+        full_key = self._cache_key(worksheet)
+        if columns is None:
+            data = self.get_all_values(worksheet, force=force)
+            key = full_key
+        else:
+            columns = list(columns)
+            data = self.get_columns(worksheet, columns, force=force)
+            # get_columns answers from the full snapshot whenever that is cached
+            key = full_key if self.cache.peek(full_key) is not None else full_key + (tuple(columns),)
+        frame = self.cache.frame(key, build)
+        if frame is None:
+            frame = build(data)
+        if columns is not None and key == full_key and not frame.empty:
+            frame = frame[[col for col in columns if col in frame.columns]]
+        return frame
+
+    # ---------------------- Range-restricted reads ----------------------
+    def values_batch_get(self, spreadsheet, ranges, major_dimension=None):
+        """Values of several A1 ranges in one request (ranges carry their 'Sheet'! prefix)"""
+        if not ranges:
+            return []
+        params = {"majorDimension": major_dimension} if major_dimension else None
+        response = self._retry_with_backoff(spreadsheet.values_batch_get, list(ranges), params=params)
+        return [value_range.get("values", []) for value_range in response.get("valueRanges", [])]
+
+    @staticmethod
+    def _sheet_range(worksheet, range_name=None):
+        return gspread.utils.absolute_range_name(worksheet.title, range_name)
+
+    def get_all_values_batch(self, worksheets, force=False):
+        """get_all_values of several worksheets; the ones not served by the cache share one request"""
+        results = [None] * len(worksheets)
+        pending = {}  # Format: {spreadsheet_id: [(index, worksheet, cache_key, revision)]}
+        for index, worksheet in enumerate(worksheets):
+            cache_key = self._cache_key(worksheet)
+            data, revision, _ = self._cached_snapshot(worksheet, cache_key, force)
+            if data is not None:
+                results[index] = data
+            else:
+                pending.setdefault(worksheet.spreadsheet.id, []).append((index, worksheet, cache_key, revision))
+        for items in pending.values():
+            spreadsheet = items[0][1].spreadsheet
+            values = self.values_batch_get(spreadsheet, [self._sheet_range(ws) for _, ws, _, _ in items])
+            for (index, worksheet, cache_key, revision), rows in zip(items, values):
+                # Same rectangular shape get_all_values returns
+                width = max((len(row) for row in rows), default=0)
+                data = [list(row) + [""] * (width - len(row)) for row in rows]
+                self.cache.put(cache_key, data, revision=revision, ttl=self._snapshot_ttl(revision))
+                self._save_snapshot(cache_key, data, revision)
+                results[index] = data
+        return results
+
+    def get_columns(self, worksheet, columns, force=False):
+        """Only the named columns of a worksheet (header first), cached as a projection
+
+        Served from the full snapshot when one is cached, otherwise the requested columns
+        (header cell included) are fetched column-major in one values_batch_get.
+        """
+        columns = list(columns)
+        full_key = self._cache_key(worksheet)
+        if not force:
+            data = self.cache.peek(full_key)
+            if data is None:
+                data = self._restore_snapshot(worksheet, full_key)
+            if data is not None:
+                return select_columns(data, columns)
+        cache_key = full_key + (tuple(columns),)
+        data, revision, _ = self._cached_snapshot(worksheet, cache_key, force)
+        if data is not None:
+            return data
+        stale = self.cache.get_stale(full_key)
+        header = stale[0][0] if stale and stale[0] else TABLE_SCHEMAS.get(worksheet.title, {}).get("headers")
+        if not header or not all(col in header for col in columns):
+            return select_columns(self.get_all_values(worksheet, force=force), columns)
+        letters = [column_letter(header.index(col) + 1) for col in columns]
+        results = self.values_batch_get(
+            worksheet.spreadsheet,
+            [self._sheet_range(worksheet, f"{letter}1:{letter}") for letter in letters],
+            major_dimension="COLUMNS"
+        )
+        values = [result[0] if result else [] for result in results]
+        if [column[0] if column else "" for column in values] != columns:
+            # Columns moved since the header we assumed, read everything instead
+            return select_columns(self.get_all_values(worksheet, force=force), columns)
+        length = max(len(column) for column in values)
+        data = [columns] + [
+            [column[i] if i < len(column) else "" for column in values] for i in range(1, length)
+        ]
+        self.cache.put(cache_key, data, revision=revision, ttl=self._snapshot_ttl(revision))
+        self._save_snapshot(cache_key, data, revision)
+        return list(data)
+
+    def _delta_sync(self, worksheet, cached):
+        """Cached snapshot plus the rows appended since, or None if a full reload is needed
+
+        One values_batch_get reads the last cached row (shifted or changed: rows were deleted
+        or rewritten), the watermark column if configured (any difference: rows were edited)
+        and the tail after the cached rows.
+        """
+        if worksheet.title not in self.delta_sync or len(cached) < 2:
+            return None
+        header, row_count = cached[0], len(cached)
+        width = len(header)
+        last_col = column_letter(width)
+        ranges = [f"A{row_count}:{last_col}{row_count}", f"A{row_count + 1}:{last_col}"]
+        watermark = self.delta_sync[worksheet.title]
+        watermark_idx = header.index(watermark) if watermark in header else None
+        if watermark_idx is not None:
+            col = column_letter(watermark_idx + 1)
+            ranges.append(f"{col}2:{col}{row_count}")
+
+        def _padded(row):
+            return list(row) + [""] * (width - len(row))
+
+        results = self.values_batch_get(worksheet.spreadsheet, [self._sheet_range(worksheet, r) for r in ranges])
+        anchor = results[0][0] if results[0] else []
+        if _padded(anchor) != _padded(cached[-1]):
+            return None
+        if watermark_idx is not None:
+            column = [row[0] if row else "" for row in results[2]]
+            column += [""] * (row_count - 1 - len(column))
+            if column != [row[watermark_idx] if len(row) > watermark_idx else "" for row in cached[1:]]:
+                return None
+        return list(cached) + [_padded(row) for row in results[1]]
+
+    # ---------------------- Persistent snapshots (cold start) ----------------------
+    def _save_snapshot(self, cache_key, data, revision):
+        if self.snapshot_store is not None:
+            self.snapshot_store.save(cache_key, data, revision)
+
+    def _restore_snapshot(self, worksheet, cache_key):
+        """Rows saved by a previous process (first read of a worksheet only), refreshed in the background
+
+        The restored snapshot is served as-is for display; a background thread checks its revision
+        and delta-syncs or reloads it, so the next rerun sees current data. Until then it is marked
+        unverified, and anything taking row numbers from it has to call verify_snapshot first.
+        """
+        if self.snapshot_store is None:
+            return None
+        with self._handle_lock:
+            if cache_key in self._restore_checked:
+                return None
+            self._restore_checked.add(cache_key)
+        saved = self.snapshot_store.load(cache_key)
+        if saved is None:
+            return None
+        rows, revision = saved
+        with self._handle_lock:
+            self._unverified.add(cache_key)
+        self.cache.put(cache_key, rows, revision=revision)
+        threading.Thread(target=self._verify_restored, args=(worksheet, cache_key), daemon=True).start()
+        return self.cache.peek(cache_key)
+
+    def _verify_restored(self, worksheet, cache_key):
+        """Replace a restored snapshot by current data unless the revision shows it is unchanged"""
+        with self._handle_lock:
+            if cache_key not in self._unverified:
+                return
+            verify_lock = self._verify_locks.setdefault(cache_key, threading.Lock())
+        # Only checks of the same snapshot wait for each other, not every render in the process
+        with verify_lock:
+            with self._handle_lock:
+                if cache_key not in self._unverified:
+                    return
+            try:
+                revision = self._spreadsheet_revision(worksheet.spreadsheet)
+                stale = self.cache.get_stale(cache_key)
+                if stale is not None and revision is not None and revision == stale[1]:
+                    # Unchanged since the previous process saved it: trust it like a fresh download
+                    self.cache.put(cache_key, stale[0], revision=revision, ttl=self._snapshot_ttl(revision))
+                elif len(cache_key) > 2:
+                    self.get_columns(worksheet, cache_key[2], force=True)
+                else:
+                    self.get_all_values(worksheet, force=True)
+            except Exception:
+                self.cache.invalidate(cache_key)  # Don't keep serving an unverified snapshot
+                self._drop_row_index(worksheet)
+            finally:
+                with self._handle_lock:
+                    self._unverified.discard(cache_key)
 
-    def get_all_records(self, worksheet):
-        """Get all records (with retry)"""
-        return self._retry_with_backoff(worksheet.get_all_records)
+    def verify_snapshot(self, worksheet):
+        """Check a snapshot restored from disk before row numbers are taken from it
+
+        Waits for (or runs) the revision check of the restored snapshot, so the rows read next
+        are current. No-op for snapshots downloaded by this process.
+        """
+        cache_key = self._cache_key(worksheet)
+        with self._handle_lock:
+            self._restore_checked.add(cache_key)  # Not read yet: download it rather than restore it
+        self._verify_restored(worksheet, cache_key)
+
+    # ---------------------- Change detection (Drive modifiedTime) ----------------------
+    def _drive_client(self):
+        """GoogleDriveHandler sharing our credentials, or None when unavailable"""
+        if self._drive is None and self.creds is not None:
+            try:
+                from google_drive_utils import GoogleDriveHandler
+                self._drive = GoogleDriveHandler(self.creds)
+            except Exception:
+                self._drive = False  # Don't retry the build on every read
+        return self._drive or None
+
+    def _snapshot_ttl(self, revision):
+        """Snapshots with a known revision are rechecked soon; others live for the full TTL"""
+        return None if revision is None else timedelta(seconds=self.revision_check_interval)
+
+    def _spreadsheet_revision(self, spreadsheet, max_age=None):
+        """Drive modifiedTime of a spreadsheet, looked up at most once per interval per process
+
+        max_age=0 always asks Drive (a lookup started after the call is shared, an older one isn't).
+        """
+        drive = self._drive_client()
+        if drive is None:
+            return None
+        max_age = self.revision_check_interval if max_age is None else max_age
+        started = time.monotonic()
+        with self._revision_lock:
+            known = self._revisions.get(spreadsheet.id)
+            if known is not None and started - known[1] < max_age:
+                return known[0]
+            lookup_lock = self._revision_lookups.setdefault(spreadsheet.id, threading.Lock())
+        # The Drive service's transport is not thread-safe, and sessions whose interval ran out
+        # together should share one files.get: the first one looks up, the others reuse its answer
+        with lookup_lock:
+            with self._revision_lock:
+                known = self._revisions.get(spreadsheet.id)
+                if known is not None and (time.monotonic() - known[1] < max_age or known[1] >= started):
+                    return known[0]
+            now = time.monotonic()
+            try:
+                self._ensure_token()
+                revision = drive.get_modified_time(spreadsheet.id)
+            except Exception:
+                revision = None  # Fall back to the TTL rather than failing the read
+            with self._revision_lock:
+                self._revisions[spreadsheet.id] = (revision, now)
+        return revision
+
+    @staticmethod
+    def _is_current(cached_revision, revision):
+        """True if the spreadsheet has not changed since the snapshot was taken
+
+        Any other revision, including one produced by our own writes, sends the worksheet
+        through a delta or full sync: modifiedTime alone can't tell our edits from others'.
+        """
+        return revision is not None and revision == cached_revision
+
+    def get_sheet_data(self, spreadsheet_name, worksheet_name):
+        """Get worksheet data (with caching and retry)"""
+        worksheet = self.get_worksheet(spreadsheet_name, worksheet_name)
+        return self.get_all_values(worksheet)
+
+    def invalidate_cache(self, worksheet):
+        """Drop the cached snapshot of one worksheet (next read hits the API)"""
+        cache_key = self._cache_key(worksheet)
+        self.cache.invalidate(cache_key)
+        self._drop_row_index(worksheet)
+        with self._handle_lock:
+            self._unverified.discard(cache_key)  # The next read downloads it anyway
+
+    # New: Manually clear cache (optional, for special scenarios)
+    def clear_cache(self, spreadsheet_name=None, worksheet_name=None):
+        if spreadsheet_name and worksheet_name:
+            worksheet = self._worksheets.get((spreadsheet_name, worksheet_name))
+            if worksheet is not None:
+                self.invalidate_cache(worksheet)
+        else:
+            self.cache.invalidate()
+
+    # ---------------------- Writes (write-through to the cache) ----------------------
+    @staticmethod
+    def _to_cells(values):
+        return ["" if v is None else str(v) for v in values]
+
+    def _patch_append(self, worksheet, data_list):
+        self.cache.patch(
+            self._cache_key(worksheet),
+            lambda rows: rows.extend(self._to_cells(row) for row in data_list)
+        )
+        with self._index_lock:
+            index = self._row_indexes.get(self._cache_key(worksheet))
+            if index is not None:
+                column = index["column"]
+                for row in data_list:
+                    index["length"] += 1
+                    if len(row) > column and row[column] not in ("", None):
+                        index["rows"][str(row[column])] = index["length"]
+
+    def _patch_update(self, worksheet, range_name, values):
+        start_row, start_col = gspread.utils.a1_to_rowcol(range_name.split(":")[0])
+
+        def _patch(rows):
+            for offset, new_values in enumerate(values):
+                row_idx = start_row - 1 + offset
+                while len(rows) <= row_idx:
+                    rows.append([])
+                # Copy-on-write so readers holding the old row are unaffected
+                row = list(rows[row_idx])
+                end_col = start_col - 1 + len(new_values)
+                if len(row) < end_col:
+                    row.extend([""] * (end_col - len(row)))
+                row[start_col - 1:end_col] = self._to_cells(new_values)
+                rows[row_idx] = row
+
+        self.cache.patch(self._cache_key(worksheet), _patch)
+        with self._index_lock:
+            index = self._row_indexes.get(self._cache_key(worksheet))
+            if index is not None and (start_col - 1 <= index["column"] < start_col - 1 + max(map(len, values), default=0)
+                                      or start_row + len(values) - 1 > index["length"]):
+                # Key cells rewritten or rows added by an update: rebuild on next lookup
+                del self._row_indexes[self._cache_key(worksheet)]
+
+    def _patch_delete(self, worksheet, start_index, end_index):
+        self.cache.patch(self._cache_key(worksheet), lambda rows: rows.__delitem__(slice(start_index - 1, end_index)))
+        count = end_index - start_index + 1
+        with self._index_lock:
+            index = self._row_indexes.get(self._cache_key(worksheet))
+            if index is not None:
+                # Rows below the deleted block move up by its size
+                index["rows"] = {
+                    value: row - count if row > end_index else row
+                    for value, row in index["rows"].items()
+                    if not start_index <= row <= end_index
+                }
+                index["length"] -= min(count, max(0, index["length"] - start_index + 1))
+
+    def _ensure_columns(self, worksheet, cols):
+        """Grow the worksheet's grid to at least cols columns before a write reaching them
+
+        Sheets rejects value writes past the grid with 400 "exceeds grid limits".
+        """
+        cache_key = self._cache_key(worksheet)
+        with self._handle_lock:
+            known = self._column_counts.setdefault(cache_key, worksheet.col_count)
+        if cols <= known:
+            return
+
+        def add_cols():
+            # Relative appendDimension rather than Worksheet.add_cols, whose absolute resize
+            # would drop columns if another process grew the sheet since we opened it
+            return worksheet.spreadsheet.batch_update({"requests": [{"appendDimension": {
+                "sheetId": worksheet.id, "dimension": "COLUMNS", "length": cols - known
+            }}]})
+
+        self._retry_with_backoff(add_cols)
+        with self._handle_lock:
+            self._column_counts[cache_key] = max(self._column_counts.get(cache_key, 0), cols)
+
+    @staticmethod
+    def _last_column(range_name, values):
+        """1-based column the write of values at range_name ends in"""
+        start_col = gspread.utils.a1_to_rowcol(range_name.split(":")[0])[1]
+        return start_col - 1 + max(map(len, values), default=0)
 
     def append_record(self, worksheet, data):
         """Append single row of data (with retry)"""
+        self.flush_writes(worksheet)
+        self._ensure_columns(worksheet, len(data))
         self._retry_with_backoff(worksheet.append_row, data)
+        self._patch_append(worksheet, [data])
 
-    # New: Batch append multiple rows (for future module optimization, no changes needed in current module)
+    # New: Batch append multiple rows
     def append_records(self, worksheet, data_list):
         """Batch append multiple rows of data"""
         if not data_list:
             return
+        self.flush_writes(worksheet)
+        self._ensure_columns(worksheet, max(map(len, data_list)))
         self._retry_with_backoff(worksheet.append_rows, data_list)
+        self._patch_append(worksheet, data_list)
+
+    def update_range(self, worksheet, range_name, values):
+        """Overwrite an A1 range with raw values (with retry)"""
+        self.flush_writes(worksheet)
+        self._ensure_columns(worksheet, self._last_column(range_name, values))
+        self._retry_with_backoff(worksheet.update, range_name=range_name, values=values, value_input_option="RAW")
+        self._patch_update(worksheet, range_name, values)
+
+    def update_ranges(self, worksheet, updates):
+        """Overwrite several A1 ranges [(range_name, values)] with one values_batch_update (with retry)"""
+        if not updates:
+            return
+        self.flush_writes(worksheet)
+        self._ensure_columns(worksheet, max(self._last_column(range_name, values) for range_name, values in updates))
+        self._retry_with_backoff(
+            worksheet.batch_update,
+            [{"range": range_name, "values": values} for range_name, values in updates],
+            value_input_option="RAW"
+        )
+        for range_name, values in updates:
+            self._patch_update(worksheet, range_name, values)
+
+    def update_cell(self, worksheet, row, col, value):
+        """Update a single cell (with retry)"""
+        self.update_range(worksheet, gspread.utils.rowcol_to_a1(row, col), [[value]])
+
+    def delete_rows(self, worksheet, start_index, end_index=None):
+        """Delete a block of rows, 1-based inclusive (with retry)"""
+        end_index = end_index or start_index
+        self.flush_writes(worksheet)
+        self._retry_with_backoff(worksheet.delete_rows, start_index, end_index)
+        self._patch_delete(worksheet, start_index, end_index)
+
+    @staticmethod
+    def _delete_rows_body(worksheet, ranges):
+        """batchUpdate body deleting (start, end) row blocks (1-based inclusive), applied in list order"""
+        return {"requests": [
+            {"deleteDimension": {"range": {
+                "sheetId": worksheet.id,
+                "dimension": "ROWS",
+                "startIndex": start - 1,
+                "endIndex": end
+            }}}
+            for start, end in ranges
+        ]}
+
+    def delete_rows_batch(self, worksheet, row_numbers):
+        """Delete any set of rows (1-based, need not be contiguous) in one request
+
+        Adjacent rows are merged into blocks, sent bottom-up so no delete shifts a later one.
+        Returns the number of rows deleted.
+        """
+        blocks = []
+        for row in sorted({int(row) for row in row_numbers}, reverse=True):
+            if blocks and blocks[-1][0] == row + 1:
+                blocks[-1][0] = row
+            else:
+                blocks.append([row, row])
+        if not blocks:
+            return 0
+        self.flush_writes(worksheet)
+        self._retry_with_backoff(worksheet.spreadsheet.batch_update, self._delete_rows_body(worksheet, blocks))
+        for start, end in blocks:
+            self._patch_delete(worksheet, start, end)
+        return sum(end - start + 1 for start, end in blocks)
+
+    def clear_worksheet(self, worksheet):
+        """Clear all values (with retry)"""
+        self.flush_writes(worksheet)
+        self._retry_with_backoff(worksheet.clear)
+        # Dropped rather than cached empty: an empty snapshot has no revision to recheck
+        self.invalidate_cache(worksheet)
+
+    # ---------------------- Key → row index ----------------------
+    def _drop_row_index(self, worksheet):
+        with self._index_lock:
+            self._row_indexes.pop(self._cache_key(worksheet), None)
+
+    def _verified_snapshot(self, worksheet, column, data):
+        """data (the cached snapshot) once its column (0-based) is known to match the sheet right now
+
+        A young snapshot is trusted without a revision check, which is fine for display but not
+        for row numbers of deletes and updates. The revision is looked up without the trust
+        window; unless it proves the snapshot current, the column is re-read (one request).
+        If that differs, rows moved under us and the snapshot is downloaded again.
+        """
+        stale = self.cache.get_stale(self._cache_key(worksheet))
+        revision = self._spreadsheet_revision(worksheet.spreadsheet, max_age=0)
+        if revision is not None and stale is not None and revision == stale[1]:
+            return data
+        letter = column_letter(column + 1)
+        result = self.values_batch_get(worksheet.spreadsheet, [self._sheet_range(worksheet, f"{letter}1:{letter}")])
+        current = [row[0] if row else "" for row in result[0]]
+        cached = [row[column] if len(row) > column else "" for row in data]
+        while cached and cached[-1] == "":
+            cached.pop()
+        if current == cached:
+            return data
+        self._drop_row_index(worksheet)
+        return self.get_all_values(worksheet, force=True)
+
+    def _key_snapshot(self, worksheet, verified=False):
+        """(key column index, snapshot), or None when the worksheet has no key column
+
+        verified=True checks the snapshot against the sheet first (row numbers for writes).
+        """
+        key = TABLE_SCHEMAS.get(worksheet.title, {}).get("key")
+        if not key:
+            return None
+        self.verify_snapshot(worksheet)
+        data = self.get_all_values(worksheet)
+        if not data or key not in data[0]:
+            return None
+        column = data[0].index(key)
+        if verified:
+            data = self._verified_snapshot(worksheet, column, data)
+        return column, data
+
+    def _indexed_row(self, worksheet, value, verified=False):
+        """(row_number, row_values) of value in the worksheet's key column, from the cached snapshot
+
+        Returns False when the worksheet has no key column (callers fall back to a server-side
+        find) and None when the value is not in the snapshot. Pass verified=True when the row
+        number is going to be written to or deleted.
+        """
+        found = self._key_snapshot(worksheet, verified)
+        if found is None:
+            return False
+        return self._lookup_row(worksheet, found[1], value)
+
+    def _lookup_row(self, worksheet, data, value):
+        """(row_number, row_values) of value in data (a _key_snapshot) through the row index, or None"""
+        key = TABLE_SCHEMAS[worksheet.title]["key"]
+        value = str(value)
+        cache_key = self._cache_key(worksheet)
+        for attempt in range(2):
+            with self._index_lock:
+                index = self._row_indexes.get(cache_key)
+                if index is None or index["length"] != len(data):
+                    column = data[0].index(key)
+                    index = self._row_indexes[cache_key] = {
+                        "column": column,
+                        "length": len(data),
+                        "rows": {
+                            row[column]: row_number
+                            for row_number, row in enumerate(data[1:], start=2)
+                            if len(row) > column and row[column]
+                        }
+                    }
+                row_number = index["rows"].get(value)
+                column = index["column"]
+            row = data[row_number - 1] if row_number is not None and row_number <= len(data) else []
+            if len(row) > column and row[column] == value:
+                row = list(row)
+                while row and row[-1] == "":
+                    row.pop()
+                return row_number, row
+            if row_number is None and attempt:
+                return None
+            # The snapshot may have been replaced since the index was built, rebuild it once
+            self._drop_row_index(worksheet)
+        return None
+
+    def find_row(self, worksheet, value):
+        """(row_number, row_values) of the first cell matching value, or None (with retry)
+
+        Key-column values (e.g. uuids) are resolved from the cached snapshot, checked against the
+        sheet first (a revision lookup, or one column read) since callers delete by the row number.
+        """
+        self.flush_writes(worksheet)
+        found = self._indexed_row(worksheet, value, verified=True)
+        if found is not False:
+            return found
+        cell = self._retry_with_backoff(worksheet.find, value)
+        if not cell:
+            return None
+        return cell.row, self._retry_with_backoff(worksheet.row_values, cell.row)
+
+    def find_rows(self, worksheet, values):
+        """{value: (row_number, row_values)} of the values found, checked against the sheet once"""
+        self.flush_writes(worksheet)
+        found = self._key_snapshot(worksheet, verified=True)
+        if found is None:
+            return super().find_rows(worksheet, values)
+        rows = {}
+        for value in values:
+            row = self._lookup_row(worksheet, found[1], value)
+            if row:
+                rows[str(value)] = row
+        return rows
+
+    def delete_rows_checked(self, worksheet, expected, column):
+        """delete_rows_batch of {row_number: value} (one request) after checking each row against
+        the sheet; raises without deleting anything if a row no longer holds its value in column
+
+        A failed check reloads the snapshot, so rows taken from the next read are right again.
+        """
+        self.flush_writes(worksheet)
+        data = self.get_all_values(worksheet)
+        if data and column in data[0]:
+            data = self._verified_snapshot(worksheet, data[0].index(column), data)
+        self._check_rows(data, expected, column)
+        return self.delete_rows_batch(worksheet, list(expected))
 
     def delete_record_by_value(self, worksheet, value):
-        """Delete row by value (with retry)"""
+        """Delete row by value (with retry); one API call when value is in the key column"""
         try:
-            cell = self._retry_with_backoff(worksheet.find, value)
-            if cell:
-                self._retry_with_backoff(worksheet.delete_rows, cell.row)
+            self.flush_writes(worksheet)
+            found = self._indexed_row(worksheet, value, verified=True)
+            if found is False:
+                cell = self._retry_with_backoff(worksheet.find, value)
+                found = (cell.row, None) if cell else None
+            if found:
+                self.delete_rows(worksheet, found[0])
                 return True
             return False
-        except gspread.CellNotFound:
-            return False
         except Exception as e:
             raise Exception(f"Failed to delete record: {str(e)}")
 
     def write_sheet(self, spreadsheet_name, worksheet_name, data):
         """Create/write to worksheet (with retry)"""
         try:
-            spreadsheet = self._retry_with_backoff(self.client.open, spreadsheet_name)
             try:
-                worksheet = self._retry_with_backoff(spreadsheet.worksheet, worksheet_name)
-            except gspread.WorksheetNotFound:
-                worksheet = self._retry_with_backoff(
-                    spreadsheet.add_worksheet,
-                    title=worksheet_name,
-                    rows="1000",
-                    cols="20"
-                )
-            self._retry_with_backoff(worksheet.clear)
-            self._retry_with_backoff(worksheet.append_rows, data)
+                worksheet = self.get_worksheet(spreadsheet_name, worksheet_name)
+            except Exception as e:
+                if "Worksheet not found" not in str(e):
+                    raise
+                worksheet = self.create_worksheet(spreadsheet_name, worksheet_name, rows=1000, cols=20)
+            self.clear_worksheet(worksheet)
+            self.append_records(worksheet, data)
             return worksheet
         except gspread.SpreadsheetNotFound:
             raise Exception(f"Spreadsheet not found: {spreadsheet_name}")
         except Exception as e:
             raise Exception(f"Failed to write to worksheet: {str(e)}")
 
-    def get_sheet_data(self, spreadsheet_name, worksheet_name):
-        """Get worksheet data (with caching and retry)"""
-        cache_key = (spreadsheet_name, worksheet_name)
-        now = datetime.now()
-        
-        # Check if cache is valid
-        if cache_key in self.cache:
-            cached_data, expire_time = self.cache[cache_key]
-            if now < expire_time:
-                return cached_data
-        
-        # Fetch new data when cache is invalid
-        worksheet = self.get_worksheet(spreadsheet_name, worksheet_name)
-        data = self._retry_with_backoff(worksheet.get_all_values)
-        # Update cache
-        self.cache[cache_key] = (data, now + self.cache_ttl)
-        return data
+    def cache_stats(self):
+        """Hit/miss counters of the shared snapshot cache"""
+        return self.cache.stats()
 
-    # New: Manually clear cache (optional, for special scenarios)
-    def clear_cache(self, spreadsheet_name=None, worksheet_name=None):
-        if spreadsheet_name and worksheet_name:
-            key = (spreadsheet_name, worksheet_name)
-            if key in self.cache:
-                del self.cache[key]
-        else:
-            self.cache = {}
+    def rate_limit_budget(self):
+        """Remaining per-minute Sheets quota as modelled by the shared rate limiter"""
+        return self.rate_limiter.budget()
+
+    # ---------------------- Write-behind queue ----------------------
+    @staticmethod
+    def _current_session_id():
+        """Streamlit session that is running this code (None outside a script run)"""
+        try:
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+            ctx = get_script_run_ctx(suppress_warning=True)
+            return ctx.session_id if ctx else None
+        except Exception:
+            return None
+
+    def _enqueue(self, worksheet, kind, *args):
+        """Queue one mutation; the cached snapshot is patched right away so reads see it"""
+        cache_key = self._cache_key(worksheet)
+        with self._write_lock:
+            pending = self._pending_writes.setdefault(cache_key, {"worksheet": worksheet, "ops": deque()})
+            pending["ops"].append({"kind": kind, "args": args, "session_id": self._current_session_id()})
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.write_flush_delay, self._flush_on_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def queue_update(self, worksheet, range_name, values):
+        """Queue an A1 range overwrite (sent with other updates as one values_batch_update)"""
+        self._enqueue(worksheet, "update", range_name, values)
+        self._patch_update(worksheet, range_name, values)
+
+    def queue_append(self, worksheet, data_list):
+        """Queue rows to append (consecutive appends are sent as one append_rows)"""
+        if not data_list:
+            return
+        self._enqueue(worksheet, "append", data_list)
+        self._patch_append(worksheet, data_list)
+
+    def queue_delete_rows(self, worksheet, start_index, end_index=None):
+        """Queue a row-block delete (consecutive deletes are sent as one batch_update)"""
+        end_index = end_index or start_index
+        self._enqueue(worksheet, "delete", start_index, end_index)
+        self._patch_delete(worksheet, start_index, end_index)
+
+    def _flush_on_timer(self):
+        with self._write_lock:
+            self._flush_timer = None
+        self.flush_writes()
+
+    def flush_writes(self, worksheet=None):
+        """Send queued mutations (one worksheet or all), returns True if everything was written"""
+        with self._flush_lock:
+            with self._write_lock:
+                if worksheet is None:
+                    batches = list(self._pending_writes.values())
+                    self._pending_writes = OrderedDict()
+                else:
+                    batch = self._pending_writes.pop(self._cache_key(worksheet), None)
+                    batches = [batch] if batch else []
+            success = True
+            for batch in batches:
+                if not self._flush_worksheet(batch["worksheet"], batch["ops"]):
+                    success = False
+            return success
+
+    def _flush_worksheet(self, worksheet, ops):
+        """Send one worksheet's ops in order, coalescing consecutive ops of the same kind"""
+        groups = []
+        for op in ops:
+            if groups and groups[-1][0] == op["kind"]:
+                groups[-1][1].append(op)
+            else:
+                groups.append((op["kind"], [op]))
+
+        for index, (kind, group) in enumerate(groups):
+            try:
+                if kind == "update":
+                    self._ensure_columns(worksheet, max(self._last_column(*op["args"]) for op in group))
+                    self._retry_with_backoff(
+                        worksheet.batch_update,
+                        [{"range": op["args"][0], "values": op["args"][1]} for op in group],
+                        value_input_option="RAW"
+                    )
+                elif kind == "append":
+                    rows = [row for op in group for row in op["args"][0]]
+                    self._ensure_columns(worksheet, max(map(len, rows)))
+                    self._retry_with_backoff(worksheet.append_rows, rows, value_input_option="RAW")
+                elif kind == "delete":
+                    # Requests are applied sequentially, same as the order they were queued in
+                    body = self._delete_rows_body(worksheet, [op["args"] for op in group])
+                    self._retry_with_backoff(worksheet.spreadsheet.batch_update, body)
+            except Exception as e:
+                # Later ops depend on row positions from this one, so drop them and resync
+                self.invalidate_cache(worksheet)
+                failed = [op for _, rest in groups[index:] for op in rest]
+                message = f"Failed to write to {worksheet.title}: {str(e)}"
+                with self._write_lock:
+                    for op in failed:
+                        if op["session_id"] is None:
+                            errors = self._worksheet_write_errors.setdefault(self._cache_key(worksheet), [])
+                        else:
+                            errors = self._write_errors.setdefault(op["session_id"], [])
+                        # Several ops from one failed batch share the same message
+                        if message not in errors:
+                            errors.append(message)
+                            del errors[:-self.max_write_errors]
+                return False
+        return True
+
+    def pop_write_errors(self, session_id=None):
+        """Errors from background flushes of writes queued by this session"""
+        session_id = session_id or self._current_session_id()
+        with self._write_lock:
+            return self._write_errors.pop(session_id, [])
+
+    def _report_worksheet_errors(self, worksheet):
+        """Show (once) errors of background writes no session queued to the next render opening worksheet"""
+        if not self._worksheet_write_errors or self._current_session_id() is None:
+            return
+        with self._write_lock:
+            errors = self._worksheet_write_errors.pop(self._cache_key(worksheet), [])
+        for error in errors:
+            st.error(error)
+
+
+@st.cache_resource(show_spinner=False)
+def get_snapshot_store(path):
+    """Process-wide SnapshotStore for path (shared by every handler)"""
+    return SnapshotStore(path)
+
+
+def get_snapshot_cache_path():
+    """Where snapshots survive restarts, from the snapshot_cache_path secret (off when unset)
+
+    Opt-in: the file holds every worksheet read, the users tab's password hashes included.
+    """
+    try:
+        return st.secrets.get("snapshot_cache_path", "")
+    except Exception:
+        return ""
+
+
+@st.cache_resource(show_spinner=False)
+def get_sheet_handler(credentials_path=""):
+    """Get the process-wide GoogleSheetHandler (authorized once, shared by all sessions)"""
+    path = get_snapshot_cache_path()
+    return GoogleSheetHandler(
+        credentials_path=credentials_path,
+        snapshot_store=get_snapshot_store(path) if path else None
+    )
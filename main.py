@@ -2,6 +2,7 @@ import streamlit as st
 import sys
 import os
 import hashlib
+import importlib
 from datetime import datetime
 
 # Solve root directory module import issue
@@ -9,92 +10,131 @@ ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-# Import real Google Sheets utility class (ensure google_sheet_utils.py exists and works properly)
-from google_sheet_utils import GoogleSheetHandler
-# Import all functional modules (unchanged)
-from modules.calendar import render_calendar
-from modules.announcements import render_announcements
-from modules.financial_planning import render_financial_planning
-from modules.attendance import render_attendance
-from modules.credit_rewards import render_credit_rewards
-from modules.money_transfers import render_money_transfers
-from modules.groups import render_groups
+# Import shared storage backend (Google Sheets by default, SQLite via the storage_backend secret)
+# Only Streamlit and the standard library load here: the Google clients, pandas and the
+# functional modules are imported on first use, so the login page renders without them
+from storage_utils import get_storage_backend, get_storage_backend_name
+from api_metrics import api_metrics, module_scope
 
 # ---------------------- Global Configuration ----------------------
 SHEET_NAME = "Student"
 USER_SHEET_TAB = "users"
 DEFAULT_ADMIN_USERS = ["admin", "root"]  # Default admin usernames
-gs_handler = GoogleSheetHandler(credentials_path="")  # Configure according to actual credential path
+SESSION_COOKIE = "scis_session"  # Signed token resuming a login after refresh / in new tabs
+LEGACY_SESSION_QUERY_PARAM = "session"  # Where tokens used to be kept, in the (shareable) URL
+_gs_handler = None  # Set by the first get_gs_handler() call of this script run
+
+def get_gs_handler():
+    """Shared storage backend, created (and authorized) on first use rather than at import"""
+    global _gs_handler
+    if _gs_handler is None:
+        _gs_handler = get_storage_backend(credentials_path="")  # Shared per server process, configure according to actual credential path
+    return _gs_handler
 
 # ---------------------- Password Encryption Tool (unchanged) ----------------------
 def hash_password(password):
     return hashlib.md5(password.encode()).hexdigest()
 
 # ---------------------- User Data Operations (real logic restored, mock data removed) ----------------------
-def init_user_sheet():
-    try:
-        gs_handler.get_worksheet(SHEET_NAME, USER_SHEET_TAB)
-    except:
-        header = ["username", "password", "register_time", "last_login"]
-        spreadsheet = gs_handler.client.open(SHEET_NAME)
-        spreadsheet.add_worksheet(title=USER_SHEET_TAB, rows=100, cols=4)
-        worksheet = spreadsheet.worksheet(USER_SHEET_TAB)
-        worksheet.append_row(header)
+def get_users():
+    """Process-wide username index of the users tab (no sheet read per lookup)"""
+    from user_utils import get_user_directory
+    return get_user_directory(SHEET_NAME, USER_SHEET_TAB)
 
 def get_user_by_username(username):
-    init_user_sheet()
     try:
-        worksheet = gs_handler.get_worksheet(SHEET_NAME, USER_SHEET_TAB)
-        data = worksheet.get_all_values()
+        return get_users().get(username)
     except Exception as e:
         st.error(f"Failed to retrieve user data: {str(e)}")
         return None
-    
-    if not data:
-        return None
-    # Iterate through real table data to match username (original logic restored)
-    for row in data[1:]:
-        if row[0] == username:
-            return {
-                "username": row[0],
-                "password": row[1],  # Encrypted password stored in the table
-                "register_time": row[2],
-                "last_login": row[3]
-            }
-    return None
 
 def add_new_user(username, password):
-    if get_user_by_username(username):
-        return False
     hashed_pwd = hash_password(password)
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     new_user = [username, hashed_pwd, now, now]
     try:
-        worksheet = gs_handler.get_worksheet(SHEET_NAME, USER_SHEET_TAB)
-        worksheet.append_row(new_user)
-        return True
+        return get_users().add(new_user)
     except Exception as e:
         st.error(f"Failed to create user: {str(e)}")
         return False
 
 def update_user_last_login(username):
-    init_user_sheet()
+    """Record the login time; the sheet write is batched in the background, login does not wait"""
+    new_last_login = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     try:
-        worksheet = gs_handler.get_worksheet(SHEET_NAME, USER_SHEET_TAB)
-        data = worksheet.get_all_values()
+        return get_users().record_login(username, new_last_login)
     except Exception as e:
-        st.error(f"Failed to retrieve user data: {str(e)}")
+        st.error(f"Failed to update user data: {str(e)}")
         return False
-    
-    if not data:
+
+def get_admin_users():
+    try:
+        admin_users = st.secrets.get("admin_users", DEFAULT_ADMIN_USERS)
+        if isinstance(admin_users, str):
+            admin_users = [user.strip() for user in admin_users.split(",")]
+    except:
+        admin_users = DEFAULT_ADMIN_USERS
+    return admin_users
+
+def start_session(username, profile):
+    st.session_state.auth_is_admin = username.strip() in get_admin_users()
+    st.session_state.auth_logged_in = True
+    st.session_state.auth_username = username
+    st.session_state.auth_profile = profile
+
+def set_session_cookie(token):
+    """Store (or with None, clear) the browser's session cookie on this run's page"""
+    st.session_state.auth_cookie_update = token or ""
+
+def write_session_cookie():
+    """Apply a pending set_session_cookie from a zero-height component (Streamlit can't set cookies)"""
+    if "auth_cookie_update" not in st.session_state:
+        return
+    import json
+    import streamlit.components.v1 as components
+    from user_utils import get_session_token_ttl
+    token = st.session_state.pop("auth_cookie_update")
+    max_age = int(get_session_token_ttl()) if token else 0
+    cookie = f"{SESSION_COOKIE}={token}; path=/; max-age={max_age}; SameSite=Strict"
+    components.html(
+        f"""<script>
+        const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+        window.parent.document.cookie = {json.dumps(cookie)} + secure;
+        </script>""",
+        height=0
+    )
+
+def resume_session_from_token():
+    """Log in from a valid session cookie (once per session): the signature is checked locally,
+    the user and the token generation against the process-wide user index"""
+    if LEGACY_SESSION_QUERY_PARAM in st.query_params:
+        # Tokens no longer go in URLs, drop ones left in bookmarks and shared links
+        del st.query_params[LEGACY_SESSION_QUERY_PARAM]
+    if st.session_state.get("auth_resume_checked"):
+        return False
+    st.session_state.auth_resume_checked = True
+    try:
+        token = st.context.cookies.get(SESSION_COOKIE)  # Cookies sent when the page was loaded
+    except Exception:
+        return False  # Streamlit before 1.37: no cookie access, log in again
+    if not token:
         return False
-    for i, row in enumerate(data[1:]):
-        if row[0] == username:
-            row_num = i + 2
-            new_last_login = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            worksheet.update_cell(row_num, 4, new_last_login)
-            return True
-    return False
+    from user_utils import verify_session_token
+    session = verify_session_token(token)
+    if session:
+        try:
+            users = get_users()
+            username = session["username"]
+            if users.get(username) is None or session["generation"] != users.session_generation(username):
+                session = None
+        except Exception:
+            return False
+    if not session:
+        # Expired, revoked by Log Out, or the account is gone
+        set_session_cookie(None)
+        return False
+    start_session(session["username"], session["profile"])
+    return True
 
 # ---------------------- Session State Initialization (unchanged) ----------------------
 def init_session_state():
@@ -109,6 +149,8 @@ def init_session_state():
         st.session_state.auth_is_admin = False
     if "auth_current_group_code" not in st.session_state:
         st.session_state.auth_current_group_code = ""
+    if "auth_profile" not in st.session_state:
+        st.session_state.auth_profile = {}  # Profile fields shown in the sidebar, read once at login
     
     if "ann_list" not in st.session_state:
         st.session_state.ann_list = []
@@ -169,6 +211,132 @@ def require_group_edit_permission(func):
         return func(*args, **kwargs)
     return wrapper
 
+# ---------------------- Module Navigation ----------------------
+def lazy_render(module_name, function_name):
+    """Render function that imports its module only when the page is first shown"""
+    def render():
+        return getattr(importlib.import_module(module_name), function_name)()
+    return render
+
+# (page id used in ?page= deep links, label, render function with permission wrappers)
+MODULE_PAGES = [
+    ("groups", "👥 Groups", lambda: require_login(require_edit_permission(
+        lazy_render("modules.groups", "render_groups")))()),
+    ("announcements", "📢 Announcements", lambda: require_login(require_edit_permission(
+        lazy_render("modules.announcements", "render_announcements")))()),
+    ("constitution", "📜 Constitution", lambda: require_login(require_edit_permission(
+        lazy_render("modules.financial_planning", "render_financial_planning")))()),
+    ("attendance", "📋 Attendance", lambda: require_login(require_edit_permission(
+        lazy_render("modules.attendance", "render_attendance")))()),
+    ("credits", "🎁 Credit & Rewards", lambda: require_login(require_edit_permission(
+        lazy_render("modules.credit_rewards", "render_credit_rewards")))()),
+    ("transfers", "💸 Money Transfers", lambda: require_login(require_edit_permission(
+        lazy_render("modules.money_transfers", "render_money_transfers")))()),
+    ("calendar", "📅 Calendar", lambda: require_login(require_group_edit_permission(
+        lazy_render("modules.calendar", "render_calendar")))()),
+]
+
+def get_navigation_mode():
+    """"sidebar" (default, only the selected module runs) or "tabs" (all modules run every rerun)"""
+    try:
+        return st.secrets.get("navigation_mode", "sidebar")
+    except Exception:
+        return "sidebar"
+
+def render_active_page():
+    """Sidebar page selector: only the active module's render function runs"""
+    page_ids = [page_id for page_id, _, _ in MODULE_PAGES]
+    labels = {page_id: label for page_id, label, _ in MODULE_PAGES}
+    # Deep link (?page=attendance) decides the initial page of a new session
+    if "nav_page" not in st.session_state:
+        requested = st.query_params.get("page", page_ids[0])
+        st.session_state.nav_page = requested if requested in page_ids else page_ids[0]
+    
+    with st.sidebar:
+        st.radio("Navigation", page_ids, format_func=lambda page_id: labels[page_id], key="nav_page")
+    # Keep the URL in sync so the current page can be bookmarked or shared
+    st.query_params["page"] = st.session_state.nav_page
+    
+    render_page = next(render for page_id, _, render in MODULE_PAGES if page_id == st.session_state.nav_page)
+    with module_scope(st.session_state.nav_page):
+        render_page()
+
+# ---------------------- API Usage (admin only) ----------------------
+def start_metrics_log():
+    """Periodically append API metrics to a local log file when metrics_log_path is configured"""
+    try:
+        path = st.secrets.get("metrics_log_path")
+        interval = float(st.secrets.get("metrics_log_interval", 300))
+    except Exception:
+        return
+    if path:
+        api_metrics.start_periodic_dump(path, interval)
+
+def show_api_usage_panel():
+    """Sidebar panel: API calls per module/operation, quota budget and cache efficiency"""
+    with st.expander("📊 API Usage", expanded=False):
+        budget = get_gs_handler().rate_limit_budget()
+        if budget:
+            st.caption(
+                f"Sheets quota left this minute: {budget['read']['per_user']} reads, "
+                f"{budget['write']['per_user']} writes ({budget['throttled']} throttled, {budget['shed']} shed)"
+            )
+        cache = get_gs_handler().cache_stats()
+        if cache:
+            st.caption(
+                f"Sheet cache: {cache['hits']} hits / {cache['revalidations']} revalidated / "
+                f"{cache['misses']} misses ({cache['hit_rate']:.0%}), "
+                f"{cache['bytes'] / 1024 / 1024:.1f} MB in {cache['entries']} snapshots"
+            )
+        rows = api_metrics.snapshot()
+        if rows:
+            st.dataframe(
+                [{key: value for key, value in row.items() if key != "histogram"} for row in rows],
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.info("No API calls recorded yet")
+        if st.button("Reset Counters", key="metrics_reset"):
+            api_metrics.reset()
+            st.rerun()
+
+# ---------------------- Bulk Account Creation (admin only) ----------------------
+BUNDLED_ROSTERS = ["members.xlsx", "student_council_members.xlsx"]
+
+def show_bulk_provisioning_panel():
+    """Sidebar panel: create accounts for every member of a roster (Excel with a 'Member Name' column)"""
+    with st.expander("🧾 Bulk Create Accounts", expanded=False):
+        uploaded_file = st.file_uploader("Upload roster", type=["xlsx"], key="prov_uploader")
+        bundled = st.selectbox("Or use a bundled roster", BUNDLED_ROSTERS, key="prov_bundled")
+        if st.button("Create Accounts", key="prov_create"):
+            import pandas as pd
+            from user_utils import provision_users
+            try:
+                df = pd.read_excel(uploaded_file or os.path.join(ROOT_DIR, bundled))
+                if "Member Name" not in df.columns:
+                    st.error("Excel must have 'Member Name' column!")
+                    return
+                names = [str(name).strip() for name in df["Member Name"].dropna()]
+                created = provision_users(
+                    get_users(), names, hash_password, datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                )
+            except Exception as e:
+                st.error(f"Failed to create accounts: {str(e)}")
+                return
+            st.session_state.prov_created = created
+            st.success(f"Created {len(created)} new accounts ({len(set(names)) - len(created)} already existed)")
+        created = st.session_state.get("prov_created")
+        if created:
+            # Initial passwords are only shown here, hand them out before leaving the page
+            import csv
+            import io
+            output = io.StringIO()
+            csv.writer(output).writerows([("username", "initial_password")] + list(created))
+            st.download_button(
+                "Download Initial Passwords", output.getvalue(), file_name="initial_passwords.csv", mime="text/csv"
+            )
+
 # ---------------------- Login/Registration Interface (all text localized to English) ----------------------
 def show_login_register_form():
     with st.sidebar:
@@ -193,18 +361,16 @@ def show_login_register_form():
                 st.error("Incorrect password!")
                 return
             
-            # Admin judgment (original logic unchanged)
-            try:
-                admin_users = st.secrets.get("admin_users", DEFAULT_ADMIN_USERS)
-                if isinstance(admin_users, str):
-                    admin_users = [user.strip() for user in admin_users.split(",")]
-            except:
-                admin_users = DEFAULT_ADMIN_USERS
-            
-            st.session_state.auth_is_admin = username.strip() in admin_users
-            st.session_state.auth_logged_in = True
-            st.session_state.auth_username = username
             update_user_last_login(username)
+            profile = get_user_by_username(username) or user
+            profile = {"register_time": profile["register_time"], "last_login": profile["last_login"]}
+            # Admin judgment (original logic unchanged)
+            start_session(username, profile)
+            # Refreshes and new tabs stay logged in until the token expires or the user logs out
+            from user_utils import issue_session_token
+            set_session_cookie(
+                issue_session_token(username, profile, generation=get_users().session_generation(username))
+            )
             st.success(f"Login successful! Welcome back, {'Admin' if st.session_state.auth_is_admin else 'User'} {username}!")
             st.rerun()
         
@@ -242,7 +408,11 @@ def main():
     )
     
     init_session_state()
+    start_metrics_log()
     
+    if not st.session_state.auth_logged_in:
+        resume_session_from_token()
+    write_session_cookie()
     if not st.session_state.auth_logged_in:
         # 1. Centered title
         st.markdown(
@@ -304,42 +474,56 @@ def main():
     
     # Main interface after login (original logic unchanged)
     st.title("SCIS Student Council Management System")
+    # Report queued writes from earlier reruns that failed to reach Google Sheets
+    for error in get_gs_handler().pop_write_errors():
+        st.error(error)
     
     with st.sidebar:
         st.markdown("---")
         st.info(f"""
         👤 Current User: {st.session_state.auth_username}  
         📌 Role: {'Admin' if st.session_state.auth_is_admin else 'Regular User'}  
-        🕒 Last Login: {get_user_by_username(st.session_state.auth_username)['last_login']}
+        🕒 Last Login: {st.session_state.auth_profile.get('last_login', '')}
         """)
+        if st.session_state.auth_is_admin:
+            show_api_usage_panel()
+            show_bulk_provisioning_panel()
+        if st.session_state.auth_is_admin and get_storage_backend_name() == "sqlite":
+            # Google Sheets stays the human-editable copy of the local database
+            if st.button("Export to Google Sheets"):
+                from google_sheet_utils import get_sheet_handler
+                try:
+                    get_gs_handler().export_to(get_sheet_handler(credentials_path=""), SHEET_NAME)
+                    st.success("Exported all tables to Google Sheets")
+                except Exception as e:
+                    st.error(f"Export failed: {str(e)}")
         if st.button("Log Out"):
+            # Revokes the tokens of every browser this user is logged in with
+            get_users().revoke_sessions(st.session_state.auth_username)
+            set_session_cookie(None)
             st.session_state.auth_logged_in = False
             st.session_state.auth_username = ""
             st.session_state.auth_is_admin = False
             st.session_state.auth_current_group_code = ""
+            st.session_state.auth_profile = {}
             st.rerun()
         st.markdown("---")
         st.info("© 2025 SCIS Student Council Management System")
     
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "👥 Groups", "📢 Announcements", "📜 Constitution",
-        "📋 Attendance","🎁 Credit & Rewards","💸 Money Transfers", "📅 Calendar"
-    ])
-    
-    with tab1:
-        require_login(require_edit_permission(render_groups))()
-    with tab2:
-        require_login(require_edit_permission(render_announcements))()
-    with tab3:
-        require_login(require_edit_permission(render_financial_planning))()
-    with tab4:
-        require_login(require_edit_permission(render_attendance))()
-    with tab5:
-        require_login(require_edit_permission(render_credit_rewards))()
-    with tab6:   
-        require_login(require_edit_permission(render_money_transfers))()
-    with tab7:
-        require_login(require_group_edit_permission(render_calendar))()
+    if get_navigation_mode() == "tabs":
+        # Legacy layout: Streamlit runs every tab body on every rerun
+        tabs = st.tabs([label for _, label, _ in MODULE_PAGES])
+        for tab, (page_id, _, render_page) in zip(tabs, MODULE_PAGES):
+            with tab, module_scope(page_id):
+                render_page()
+    else:
+        render_active_page()
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # Flush writes queued during this rerun (st.rerun() also passes through here);
+        # a rerun that never touched the backend has nothing queued and must not create it
+        if _gs_handler is not None:
+            _gs_handler.flush_writes()
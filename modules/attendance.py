@@ -4,7 +4,7 @@ import pandas as pd
 from datetime import datetime
 import sys
 import os
-import time
+from bisect import bisect_left
 
 # Resolve root directory module import issue
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -12,7 +12,7 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
 # Import Google Sheets utility class
-from google_sheet_utils import GoogleSheetHandler
+from storage_utils import get_storage_backend, column_letter, TABLE_SCHEMAS
 
 # Handle Google API errors
 try:
@@ -24,6 +24,58 @@ except ImportError:
             self.content = content
             self.uri = uri
 
+ATTENDANCE_HEADERS = ["member_id", "member_name", "meeting_id", "meeting_name", "is_present", "updated_at"]
+MATRIX_SHEET = "AttendanceMatrix"
+MEETINGS_SHEET = "AttendanceMeetings"
+MATRIX_HEADERS = TABLE_SCHEMAS[MATRIX_SHEET]["headers"]  # Followed by one column per meeting
+MEETINGS_HEADERS = TABLE_SCHEMAS[MEETINGS_SHEET]["headers"]
+
+def get_attendance_layout():
+    """"rows" (default): one Attendance row per (member, meeting)
+    "matrix": one AttendanceMatrix row per member with a TRUE/FALSE column per meeting, plus the
+    AttendanceMeetings list; adding a meeting is one column write and taking attendance one cell write
+    """
+    try:
+        return st.secrets.get("attendance_layout", "rows")
+    except Exception:
+        return "rows"
+
+def open_matrix_sheets(sheet_handler):
+    """AttendanceMatrix and AttendanceMeetings worksheets, created with their headers on first use"""
+    sheets = []
+    for name in (MATRIX_SHEET, MEETINGS_SHEET):
+        try:
+            sheets.append(sheet_handler.get_worksheet(spreadsheet_name="Student", worksheet_name=name))
+        except Exception:
+            headers = TABLE_SCHEMAS[name]["headers"]
+            worksheet = sheet_handler.create_worksheet("Student", name, rows=100, cols=len(headers))
+            sheet_handler.append_record(worksheet, headers)
+            sheets.append(worksheet)
+    return sheets
+
+def parse_row_layout(data):
+    """(members, meetings, records) of a row-layout Attendance sheet, for moving it to the matrix layout"""
+    members, meetings, records = {}, {}, {}
+    header = data[0] if data else []
+    for row in data[1:]:
+        item = dict(zip(header, row))
+        try:
+            member_id = int(item.get("member_id", ""))
+        except ValueError:
+            continue
+        members.setdefault(member_id, item.get("member_name", ""))
+        try:
+            meeting_id = int(item.get("meeting_id", ""))
+        except ValueError:
+            continue
+        meetings.setdefault(meeting_id, item.get("meeting_name", ""))
+        records[(member_id, meeting_id)] = str(item.get("is_present", "")).upper() == "TRUE"
+    return (
+        [{"id": member_id, "name": name} for member_id, name in members.items()],
+        [{"id": meeting_id, "name": name} for meeting_id, name in meetings.items()],
+        records
+    )
+
 def render_attendance():
     """Render attendance module interface, ensuring Google Sheet and interface are completely consistent"""
     st.set_page_config(layout="wide")
@@ -31,14 +83,19 @@ def render_attendance():
     st.markdown("---")
 
     # Initialize Google Sheets connection
+    matrix_layout = get_attendance_layout() == "matrix"
     sheet_handler = None
     attendance_sheet = None
+    matrix_sheet = meetings_sheet = None
     try:
-        sheet_handler = GoogleSheetHandler(credentials_path="")
-        attendance_sheet = sheet_handler.get_worksheet(
-            spreadsheet_name="Student",
-            worksheet_name="Attendance"
-        )
+        sheet_handler = get_storage_backend(credentials_path="")
+        if matrix_layout:
+            matrix_sheet, meetings_sheet = open_matrix_sheets(sheet_handler)
+        else:
+            attendance_sheet = sheet_handler.get_worksheet(
+                spreadsheet_name="Student",
+                worksheet_name="Attendance"
+            )
     except Exception as e:
         st.error(f"Google Sheets initialization failed: {str(e)}")
 
@@ -57,102 +114,190 @@ def render_attendance():
     # New: Store row index mapping for incremental updates
     if "row_index_map" not in st.session_state:
         st.session_state.row_index_map = {}  # {(member_id, meeting_id): row_number}
+    # Matrix layout: sheet row of each member, column of each meeting, AttendanceMeetings row of each meeting
+    if "att_matrix_index" not in st.session_state:
+        st.session_state.att_matrix_index = {"rows": {}, "cols": {}, "meeting_rows": {}, "header": list(MATRIX_HEADERS),
+                                             "last_row": 1, "meetings_last_row": 1}
+
+    # Sheet range and values of one record: a row in the row layout, a cell in the matrix layout
+    def record_update(member_id, meeting_id, is_present):
+        """(A1 range, values) writing one record, or None when its position in the sheet is unknown"""
+        if matrix_layout:
+            index = st.session_state.att_matrix_index
+            row, col = index["rows"].get(member_id), index["cols"].get(meeting_id)
+            if not row or not col:
+                return None
+            return f"{column_letter(col)}{row}", [["TRUE" if is_present else "FALSE"]]
+        
+        row_number = st.session_state.row_index_map.get((member_id, meeting_id))
+        if not row_number:
+            return None
+        member = next(m for m in st.session_state.att_members if m["id"] == member_id)
+        meeting = next(m for m in st.session_state.att_meetings if m["id"] == meeting_id) if meeting_id else None
+        # Update only this row (1-based index)
+        return f"A{row_number}:F{row_number}", [record_row(member, meeting, is_present)]
+
+    def record_row(member, meeting, is_present):
+        """Row-layout Attendance row; meeting=None is a member-only row (used while there are no meetings)"""
+        return [
+            str(member["id"]),
+            member["name"],
+            str(meeting["id"]) if meeting else "",
+            meeting["name"] if meeting else "",
+            "TRUE" if is_present else "FALSE",
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ]
+
+    # ---------------------- Row layout structure changes ----------------------
+    # Only the affected rows are written and row_index_map is adjusted in place, never rebuilt
+    def append_record_rows(keyed_rows):
+        """Append [((member_id, meeting_id), row)] in one write and index the new rows"""
+        if not attendance_sheet or not sheet_handler or not keyed_rows:
+            return True
+        try:
+            # Rows land after the last row of the (cached) snapshot, same as Sheets' append
+            sheet_handler.verify_snapshot(attendance_sheet)
+            next_row = len(sheet_handler.get_all_values(attendance_sheet)) + 1
+            rows = [row for _, row in keyed_rows]
+            if next_row == 1:
+                rows.insert(0, ATTENDANCE_HEADERS)
+                next_row = 2
+            sheet_handler.append_records(attendance_sheet, rows)
+        except Exception as e:
+            st.error(f"Update failed: {str(e)}")
+            return False
+        for offset, (key, _) in enumerate(keyed_rows):
+            st.session_state.row_index_map[key] = next_row + offset
+        st.session_state.last_sync_time = datetime.now()
+        return True
 
-    # Full update Google Sheets data (overwrite mode) - used for initial sync and when structure changes
-    def full_update_sheets(max_retries=3):
+    def add_member_rows(new_members):
+        """Rows for new members: one per existing meeting (absent), or a member-only row"""
+        meetings = st.session_state.att_meetings
+        return append_record_rows([
+            ((member["id"], meeting["id"] if meeting else None), record_row(member, meeting, False))
+            for member in new_members
+            for meeting in (meetings or [None])
+        ])
+
+    def add_meeting_rows(meeting):
+        """Rows for a new meeting: member-only rows are turned into it, the rest appended in one write"""
         if not attendance_sheet or not sheet_handler:
             return True
-            
-        retry_count = 0
-        while retry_count < max_retries:
+        row_index_map = st.session_state.row_index_map
+        updates, appends = [], []
+        for member in st.session_state.att_members:
+            row = record_row(member, meeting, st.session_state.att_records.get((member["id"], meeting["id"]), False))
+            row_number = row_index_map.get((member["id"], None))
+            if row_number:
+                updates.append((member["id"], row_number, row))
+            else:
+                appends.append(((member["id"], meeting["id"]), row))
+        if updates:
             try:
-                # Prepare header
-                rows = [["member_id", "member_name", "meeting_id", "meeting_name", "is_present", "updated_at"]]
-                row_index_map = {}  # Reset index map
-                
-                # Prepare all attendance records
-                for member in st.session_state.att_members:
-                    if st.session_state.att_meetings:
-                        for meeting in st.session_state.att_meetings:
-                            is_present = st.session_state.att_records.get((member["id"], meeting["id"]), False)
-                            row_data = [
-                                str(member["id"]),
-                                member["name"],
-                                str(meeting["id"]),
-                                meeting["name"],
-                                "TRUE" if is_present else "FALSE",
-                                datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            ]
-                            rows.append(row_data)
-                            row_index_map[(member["id"], meeting["id"])] = len(rows)  # Store 1-based index
-                    else:
-                        # Only keep basic member info when there are no meetings
-                        row_data = [
-                            str(member["id"]),
-                            member["name"],
-                            "", "", "FALSE",
-                            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        ]
-                        rows.append(row_data)
-                        row_index_map[(member["id"], None)] = len(rows)
-                
-                # Clear all content before writing to ensure complete consistency
-                attendance_sheet.clear()
-                # Ensure all rows are written (including header in empty state)
-                if rows:
-                    attendance_sheet.append_rows(rows, value_input_option='RAW')
-                
-                # Update row index map and last sync time
-                st.session_state.row_index_map = row_index_map
-                st.session_state.last_sync_time = datetime.now()
-                return True
-            except HttpError as e:
-                if e.resp.status == 429:
-                    retry_after = int(e.resp.get('retry-after', 5))
-                    st.warning(f"Request rate limit exceeded, retrying in {retry_after} seconds...")
-                    time.sleep(retry_after)
-                    retry_count += 1
-                else:
-                    st.error(f"Update failed: {str(e)}")
-                    return False
+                sheet_handler.update_ranges(
+                    attendance_sheet, [(f"A{row_number}:F{row_number}", [row]) for _, row_number, row in updates]
+                )
             except Exception as e:
                 st.error(f"Update failed: {str(e)}")
                 return False
-        
-        st.error("Maximum retries reached, synchronization failed")
-        return False
+            for member_id, row_number, _ in updates:
+                del row_index_map[(member_id, None)]
+                row_index_map[(member_id, meeting["id"])] = row_number
+        return append_record_rows(appends)
+
+    def delete_meeting_rows(meeting_id):
+        """Delete the meeting's rows in one batch request (the last meeting's become member-only rows)"""
+        if not attendance_sheet or not sheet_handler:
+            return True
+        row_index_map = st.session_state.row_index_map
+        keys = [key for key in row_index_map if key[1] == meeting_id]
+        if not keys:
+            return True
+        try:
+            if not st.session_state.att_meetings:
+                # Keep every member listed once no meeting is left
+                members = {member["id"]: member for member in st.session_state.att_members}
+                sheet_handler.update_ranges(attendance_sheet, [
+                    (f"A{row_index_map[key]}:F{row_index_map[key]}", [record_row(members[key[0]], None, False)])
+                    for key in keys if key[0] in members
+                ])
+                for key in keys:
+                    row_number = row_index_map.pop(key)
+                    if key[0] in members:
+                        row_index_map[(key[0], None)] = row_number
+                st.session_state.last_sync_time = datetime.now()
+                return True
+            deleted = sorted(row_index_map[key] for key in keys)
+            sheet_handler.delete_rows_batch(attendance_sheet, deleted)
+        except Exception as e:
+            st.error(f"Update failed: {str(e)}")
+            return False
+        for key in keys:
+            del row_index_map[key]
+        # Every remaining row moves up by the number of deleted rows above it
+        for key, row_number in row_index_map.items():
+            row_index_map[key] = row_number - bisect_left(deleted, row_number)
+        st.session_state.last_sync_time = datetime.now()
+        return True
+
+    def add_missing_records(changes):
+        """Write records that have no row (row layout) or no member row (matrix layout) in the sheet
+
+        Records of members or meetings no longer in the sheet are skipped with a warning.
+        """
+        members = {member["id"]: member for member in st.session_state.att_members}
+        meetings = {meeting["id"]: meeting for meeting in st.session_state.att_meetings}
+        known = [change for change in changes if change[0] in members and change[1] in meetings]
+        if len(known) < len(changes):
+            st.warning(f"{len(changes) - len(known)} record(s) of members or meetings no longer in the sheet were skipped")
+        if not matrix_layout:
+            return append_record_rows([
+                ((member_id, meeting_id), record_row(members[member_id], meetings[meeting_id], is_present))
+                for member_id, meeting_id, is_present in known
+            ])
+        index = st.session_state.att_matrix_index
+        new_members = [members[member_id] for member_id in dict.fromkeys(
+            member_id for member_id, meeting_id, _ in known if meeting_id in index["cols"]
+        ) if member_id not in index["rows"]]
+        if not add_matrix_members(new_members):
+            return False
+        updates = [update for update in (record_update(*change) for change in known) if update is not None]
+        if not updates:
+            return True
+        try:
+            sheet_handler.update_ranges(matrix_sheet, updates)
+        except Exception as e:
+            st.error(f"Update failed: {str(e)}")
+            return False
+        return True
 
     # Incremental update - only update changed data
     def incremental_update(member_id, meeting_id, is_present):
-        if not attendance_sheet or not sheet_handler:
+        return bulk_update([(member_id, meeting_id, is_present)])
+
+    # Bulk update - any set of (member_id, meeting_id, is_present) changes in one batched write
+    def bulk_update(changes):
+        records_sheet = matrix_sheet if matrix_layout else attendance_sheet
+        for member_id, meeting_id, is_present in changes:
+            st.session_state.att_records[(member_id, meeting_id)] = is_present
+        if not records_sheet or not sheet_handler:
             return True
             
         try:
-            # Check if we have the row index for this record
-            row_key = (member_id, meeting_id)
-            row_number = st.session_state.row_index_map.get(row_key)
-            
-            if not row_number:
-                # If we don't have the index, fall back to full update
-                st.warning("Could not find record index, performing full update")
-                return full_update_sheets()
-            
-            # Prepare updated data
-            member = next(m for m in st.session_state.att_members if m["id"] == member_id)
-            meeting = next(m for m in st.session_state.att_meetings if m["id"] == meeting_id) if meeting_id else None
-            
-            updated_data = [
-                str(member_id),
-                member["name"],
-                str(meeting_id) if meeting_id else "",
-                meeting["name"] if meeting else "",
-                "TRUE" if is_present else "FALSE",
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            ]
-            
-            # Update only this row (1-based index)
-            range_name = f"A{row_number}:F{row_number}"
-            attendance_sheet.update(range_name, [updated_data], value_input_option='RAW')
+            updates = [record_update(*change) for change in changes]
+            if None in updates:
+                # Position unknown (e.g. rows added in another session): re-read the sheet, never rewrite it
+                reload_from_sheets()
+                for member_id, meeting_id, is_present in changes:
+                    st.session_state.att_records[(member_id, meeting_id)] = is_present
+                updates = [record_update(*change) for change in changes]
+                missing = [change for change, update in zip(changes, updates) if update is None]
+                if missing and not add_missing_records(missing):
+                    return False
+            updates = [update for update in updates if update is not None]
+            if updates:
+                sheet_handler.update_ranges(records_sheet, updates)
             
             # Update last sync time
             st.session_state.last_sync_time = datetime.now()
@@ -171,12 +316,16 @@ def render_attendance():
     # Sync data from Google Sheets (ensure consistency with interface structure)
     def sync_from_sheets(force=False):
         """Sync data from Google Sheet to local, force=True will overwrite local state"""
+        if matrix_layout:
+            return sync_matrix()
         if not attendance_sheet or not sheet_handler:
             return
         
         try:
-            all_data = attendance_sheet.get_all_values()
-            if not all_data:
+            # row_index_map is built from this read, so it must not come from an unchecked disk copy
+            sheet_handler.verify_snapshot(attendance_sheet)
+            frame = sheet_handler.get_frame(attendance_sheet)
+            if frame.columns.empty:
                 # Clear local state when worksheet is empty
                 if force:
                     st.session_state.att_members = []
@@ -185,47 +334,41 @@ def render_attendance():
                     st.session_state.row_index_map = {}
                 return
                 
-            headers = all_data[0] if len(all_data) > 0 else []
-            if headers != ["member_id", "member_name", "meeting_id", "meeting_name", "is_present", "updated_at"]:
+            if list(frame.columns) != ["member_id", "member_name", "meeting_id", "meeting_name", "is_present", "updated_at"]:
                 st.warning("Google Sheet format is incorrect, using local data")
                 return
 
-            # Extract meeting data (deduplicated)
-            meetings = []
-            meeting_ids = set()
-            for row in all_data[1:]:
-                if len(row) >= 4 and row[2] and row[3] and row[2] not in meeting_ids:
-                    meeting_ids.add(row[2])
-                    try:
-                        meetings.append({"id": int(row[2]), "name": row[3]})
-                    except (ValueError, IndexError):
-                        continue  # Skip rows with format errors
+            # Extract meeting data (deduplicated, rows with format errors have no id)
+            meeting_rows = frame[frame["meeting_id"].notna() & (frame["meeting_name"] != "")]
+            meeting_rows = meeting_rows.drop_duplicates("meeting_id")
+            meetings = [
+                {"id": meeting_id, "name": name}
+                for meeting_id, name in zip(meeting_rows["meeting_id"].astype(int).tolist(), meeting_rows["meeting_name"])
+            ]
             
             # Extract member data (deduplicated)
-            members = []
-            member_ids = set()
-            for row in all_data[1:]:
-                if len(row) >= 2 and row[0] and row[1] and row[0] not in member_ids:
-                    member_ids.add(row[0])
-                    try:
-                        members.append({"id": int(row[0]), "name": row[1]})
-                    except (ValueError, IndexError):
-                        continue  # Skip rows with format errors
+            member_rows = frame[frame["member_id"].notna() & (frame["member_name"] != "")]
+            member_rows = member_rows.drop_duplicates("member_id")
+            members = [
+                {"id": member_id, "name": name}
+                for member_id, name in zip(member_rows["member_id"].astype(int).tolist(), member_rows["member_name"])
+            ]
             
             # Extract attendance records and build row index map
-            records = {}
-            row_index_map = {}
-            for row_idx, row in enumerate(all_data[1:], start=2):  # Rows are 1-based in Sheets, header is row 1
-                if len(row) >= 5 and row[0] and row[2]:
-                    try:
-                        member_id = int(row[0])
-                        meeting_id = int(row[2])
-                        # Ensure records only come from existing members and meetings
-                        if any(m["id"] == member_id for m in members) and any(mt["id"] == meeting_id for mt in meetings):
-                            records[(member_id, meeting_id)] = row[4].lower() == "true"
-                            row_index_map[(member_id, meeting_id)] = row_idx
-                    except (ValueError, IndexError):
-                        continue  # Skip rows with format errors
+            # (records only come from existing members and meetings; sheet row = frame index + 2)
+            valid = frame[
+                frame["member_id"].isin(member_rows["member_id"]) & frame["meeting_id"].isin(meeting_rows["meeting_id"])
+            ]
+            keys = list(zip(valid["member_id"].astype(int).tolist(), valid["meeting_id"].astype(int).tolist()))
+            records = dict(zip(keys, valid["is_present"].tolist()))
+            row_index_map = dict(zip(keys, (valid.index + 2).tolist()))
+            # Member-only rows (written while there are no meetings) are reused by the next new meeting
+            member_only = frame[frame["member_id"].isin(member_rows["member_id"]) & frame["meeting_id"].isna()]
+            member_only = member_only.drop_duplicates("member_id")
+            row_index_map.update(zip(
+                [(member_id, None) for member_id in member_only["member_id"].astype(int).tolist()],
+                (member_only.index + 2).tolist()
+            ))
             
             # Force update local state
             st.session_state.att_meetings = meetings
@@ -237,6 +380,218 @@ def render_attendance():
         except Exception as e:
             st.warning(f"Synchronization failed: {str(e)}")
 
+    def reload_from_sheets():
+        """Drop and fully re-read the shared snapshot, then sync, so cells edited directly in the sheet
+        are picked up (a delta refresh would only see appended rows)"""
+        if attendance_sheet and sheet_handler:
+            sheet_handler.invalidate_cache(attendance_sheet)
+            sheet_handler.get_all_values(attendance_sheet, force=True)
+        if matrix_sheet and meetings_sheet and sheet_handler:
+            sheet_handler.invalidate_cache(matrix_sheet)
+            sheet_handler.invalidate_cache(meetings_sheet)
+            sheet_handler.get_all_values_batch([matrix_sheet, meetings_sheet], force=True)
+        sync_from_sheets(force=True)
+
+    # ---------------------- Matrix layout ----------------------
+    def set_matrix_index(header, rows, cols, meeting_rows, last_row, meetings_last_row):
+        st.session_state.att_matrix_index = {
+            "rows": rows, "cols": cols, "meeting_rows": meeting_rows, "header": header,
+            "last_row": last_row, "meetings_last_row": meetings_last_row
+        }
+
+    def full_update_matrix():
+        """Write both matrix sheets from local state (only used to fill them when migrating)"""
+        if not matrix_sheet or not sheet_handler:
+            return True
+        try:
+            members = st.session_state.att_members
+            meetings = st.session_state.att_meetings
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            header = MATRIX_HEADERS + [meeting["name"] for meeting in meetings]
+            rows = [header] + [
+                [str(member["id"]), member["name"]] + [
+                    "TRUE" if st.session_state.att_records.get((member["id"], meeting["id"]), False) else "FALSE"
+                    for meeting in meetings
+                ]
+                for member in members
+            ]
+            meeting_rows = [MEETINGS_HEADERS] + [[str(meeting["id"]), meeting["name"], now] for meeting in meetings]
+            sheet_handler.write_sheet("Student", MATRIX_SHEET, rows)
+            sheet_handler.write_sheet("Student", MEETINGS_SHEET, meeting_rows)
+            set_matrix_index(
+                header,
+                {member["id"]: row for row, member in enumerate(members, start=2)},
+                {meeting["id"]: col for col, meeting in enumerate(meetings, start=len(MATRIX_HEADERS) + 1)},
+                {meeting["id"]: row for row, meeting in enumerate(meetings, start=2)},
+                len(rows), len(meeting_rows)
+            )
+            st.session_state.last_sync_time = datetime.now()
+            return True
+        except Exception as e:
+            st.error(f"Update failed: {str(e)}")
+            return False
+
+    def migrate_to_matrix():
+        """Fill empty matrix sheets from the row-layout Attendance sheet, if it has data
+
+        Looked at once per session: later renders of empty matrix sheets skip the legacy sheet.
+        """
+        if st.session_state.get("att_migration_checked"):
+            return False
+        st.session_state.att_migration_checked = True
+        try:
+            legacy_sheet = sheet_handler.get_worksheet(spreadsheet_name="Student", worksheet_name="Attendance")
+            data = sheet_handler.get_all_values(legacy_sheet)
+        except Exception:
+            return False
+        if len(data) <= 1:
+            return False
+        members, meetings, records = parse_row_layout(data)
+        st.session_state.att_members = members
+        st.session_state.att_meetings = meetings
+        st.session_state.att_records = records
+        return full_update_matrix()
+
+    def sync_matrix():
+        """Load members, meetings and records from the two matrix sheets (one batched read)"""
+        if not matrix_sheet or not meetings_sheet or not sheet_handler:
+            return
+        try:
+            # The cell index is built from this read, so it must not come from an unchecked disk copy
+            sheet_handler.verify_snapshot(matrix_sheet)
+            sheet_handler.verify_snapshot(meetings_sheet)
+            matrix_data, meeting_data = sheet_handler.get_all_values_batch([matrix_sheet, meetings_sheet])
+            if len(matrix_data) <= 1 and len(meeting_data) <= 1 and migrate_to_matrix():
+                return
+            header = list(matrix_data[0]) if matrix_data else list(MATRIX_HEADERS)
+            if header[:len(MATRIX_HEADERS)] != MATRIX_HEADERS or (
+                meeting_data and meeting_data[0][:len(MEETINGS_HEADERS)] != MEETINGS_HEADERS
+            ):
+                st.warning("Google Sheet format is incorrect, using local data")
+                return
+
+            # Meetings keep the AttendanceMeetings order; each one's column is found by its name
+            meetings, cols, meeting_rows = [], {}, {}
+            for row_number, row in enumerate(meeting_data[1:], start=2):
+                try:
+                    meeting_id = int(row[0])
+                except (ValueError, IndexError):
+                    continue
+                name = row[1] if len(row) > 1 else ""
+                if meeting_id in cols or name not in header[len(MATRIX_HEADERS):]:
+                    continue
+                meetings.append({"id": meeting_id, "name": name})
+                cols[meeting_id] = header.index(name, len(MATRIX_HEADERS)) + 1
+                meeting_rows[meeting_id] = row_number
+
+            members, rows, records = [], {}, {}
+            for row_number, row in enumerate(matrix_data[1:], start=2):
+                try:
+                    member_id = int(row[0])
+                except (ValueError, IndexError):
+                    continue
+                if member_id in rows:
+                    continue
+                members.append({"id": member_id, "name": row[1] if len(row) > 1 else ""})
+                rows[member_id] = row_number
+                for meeting_id, col in cols.items():
+                    records[(member_id, meeting_id)] = len(row) >= col and row[col - 1].upper() == "TRUE"
+
+            st.session_state.att_meetings = meetings
+            st.session_state.att_members = members
+            st.session_state.att_records = records
+            set_matrix_index(header, rows, cols, meeting_rows, max(len(matrix_data), 1), max(len(meeting_data), 1))
+            st.session_state.last_sync_time = datetime.now()
+        except Exception as e:
+            st.warning(f"Synchronization failed: {str(e)}")
+
+    def add_matrix_members(new_members):
+        """Append rows for new members (absent from every existing meeting) in one write"""
+        if not matrix_sheet or not sheet_handler or not new_members:
+            return True
+        index = st.session_state.att_matrix_index
+        meeting_cols = set(index["cols"].values())
+        try:
+            sheet_handler.append_records(matrix_sheet, [
+                [str(member["id"]), member["name"]] + [
+                    "FALSE" if col in meeting_cols else ""
+                    for col in range(len(MATRIX_HEADERS) + 1, len(index["header"]) + 1)
+                ]
+                for member in new_members
+            ])
+        except Exception as e:
+            st.error(f"Update failed: {str(e)}")
+            return False
+        for offset, member in enumerate(new_members, start=1):
+            index["rows"][member["id"]] = index["last_row"] + offset
+        index["last_row"] += len(new_members)
+        return True
+
+    def add_matrix_meeting(meeting, is_present=True):
+        """One column write (header + every member's cell) plus the meeting's AttendanceMeetings row"""
+        if not matrix_sheet or not meetings_sheet or not sheet_handler:
+            return True
+        index = st.session_state.att_matrix_index
+        header = index["header"]
+        # Reuse the column of a deleted meeting before growing the sheet
+        col = next((i + 1 for i in range(len(MATRIX_HEADERS), len(header)) if not header[i]), len(header) + 1)
+        member_rows = set(index["rows"].values())
+        values = [[meeting["name"]]] + [
+            [("TRUE" if is_present else "FALSE") if row in member_rows else ""]
+            for row in range(2, index["last_row"] + 1)
+        ]
+        letter = column_letter(col)
+        try:
+            sheet_handler.update_range(matrix_sheet, f"{letter}1:{letter}{index['last_row']}", values)
+            sheet_handler.append_record(
+                meetings_sheet, [str(meeting["id"]), meeting["name"], datetime.now().strftime("%Y-%m-%d %H:%M:%S")]
+            )
+        except Exception as e:
+            st.error(f"Update failed: {str(e)}")
+            return False
+        header.extend([""] * (col - len(header)))
+        header[col - 1] = meeting["name"]
+        index["cols"][meeting["id"]] = col
+        index["meetings_last_row"] += 1
+        index["meeting_rows"][meeting["id"]] = index["meetings_last_row"]
+        return True
+
+    def delete_matrix_meeting(meeting_id):
+        """Blank the meeting's column (one write), then delete its AttendanceMeetings row"""
+        if not matrix_sheet or not meetings_sheet or not sheet_handler:
+            return True
+        index = st.session_state.att_matrix_index
+        col, meeting_row = index["cols"].get(meeting_id), index["meeting_rows"].get(meeting_id)
+        if not col or not meeting_row:
+            # Position unknown: re-read the sheets (never rewrite them); the meeting stays deleted locally
+            reload_from_sheets()
+            st.session_state.att_meetings = [m for m in st.session_state.att_meetings if m["id"] != meeting_id]
+            st.session_state.att_records = {
+                key: value for key, value in st.session_state.att_records.items() if key[1] != meeting_id
+            }
+            index = st.session_state.att_matrix_index
+            col, meeting_row = index["cols"].get(meeting_id), index["meeting_rows"].get(meeting_id)
+            if not col or not meeting_row:
+                return True  # Already gone from the sheets
+        letter = column_letter(col)
+        try:
+            # Column first: a meeting row without its column is ignored on sync, not the reverse
+            sheet_handler.update_range(
+                matrix_sheet, f"{letter}1:{letter}{index['last_row']}", [[""]] * index["last_row"]
+            )
+            sheet_handler.delete_rows(meetings_sheet, meeting_row)
+        except Exception as e:
+            st.error(f"Update failed: {str(e)}")
+            return False
+        index["header"][col - 1] = ""
+        del index["cols"][meeting_id]
+        del index["meeting_rows"][meeting_id]
+        for other_id, row in index["meeting_rows"].items():
+            if row > meeting_row:
+                index["meeting_rows"][other_id] = row - 1
+        index["meetings_last_row"] -= 1
+        return True
+
     # Initial sync (force sync to ensure consistency with Sheet)
     sync_from_sheets(force=True)
 
@@ -277,7 +632,7 @@ def render_attendance():
     with col_sync:
         if st.button("🔄 Sync Data", key="sync_button"):
             with st.spinner("Synchronizing with Google Sheet..."):
-                sync_from_sheets(force=True)
+                reload_from_sheets()
                 st.success("Successfully synchronized with Google Sheet")
                 st.session_state.att_needs_refresh = True
 
@@ -308,7 +663,7 @@ def render_attendance():
                             return
                         
                         new_members = [name.strip() for name in df["Member Name"].dropna().unique() if name.strip()]
-                        added = 0
+                        added = []
                         
                         for name in new_members:
                             if not any(m["name"] == name for m in st.session_state.att_members):
@@ -317,11 +672,12 @@ def render_attendance():
                                 # Add default records for existing meetings
                                 for meeting in st.session_state.att_meetings:
                                     st.session_state.att_records[(new_id, meeting["id"])] = False
-                                added += 1
+                                added.append({"id": new_id, "name": name})
                         
-                        st.success(f"Added {added} new members")
-                        # Since structure changed, do full update
-                        if not full_update_sheets():
+                        st.success(f"Added {len(added)} new members")
+                        # Append only the new members' rows
+                        synced = add_matrix_members(added) if matrix_layout else add_member_rows(added)
+                        if not synced:
                             st.warning("Data synchronization failed, please try again later")
                         st.session_state.att_needs_refresh = True
                     except Exception as e:
@@ -346,16 +702,20 @@ def render_attendance():
                         st.error("Meeting already exists")
                         return
                     
-                    new_meeting_id = len(st.session_state.att_meetings) + 1
-                    st.session_state.att_meetings.append({"id": new_meeting_id, "name": meeting_name})
+                    # The id of the last meeting can be reused once it is deleted; that is safe because rows
+                    # and columns are looked up from the sheet on every render, never kept across reruns
+                    new_meeting_id = max((m["id"] for m in st.session_state.att_meetings), default=0) + 1
+                    new_meeting = {"id": new_meeting_id, "name": meeting_name}
+                    st.session_state.att_meetings.append(new_meeting)
                     
                     # Add default records for each member
                     for member in st.session_state.att_members:
                         st.session_state.att_records[(member["id"], new_meeting_id)] = True
                     
                     st.success(f"Added meeting: {meeting_name}")
-                    # Since structure changed, do full update
-                    if not full_update_sheets():
+                    # Matrix layout: one column write; row layout: append only the new meeting's rows
+                    synced = add_matrix_meeting(new_meeting) if matrix_layout else add_meeting_rows(new_meeting)
+                    if not synced:
                         st.warning("Data synchronization failed, please try again later")
                     st.session_state.att_needs_refresh = True
 
@@ -374,8 +734,12 @@ def render_attendance():
                         st.session_state.att_records = {(m_id, mt_id): v for (m_id, mt_id), v in st.session_state.att_records.items() if mt_id != selected_meeting["id"]}
                         
                         st.success(f"Deleted meeting: {selected_meeting['name']}")
-                        # Since structure changed, do full update
-                        if not full_update_sheets():
+                        # Matrix layout: blank one column; row layout: delete the meeting's rows in one request
+                        if matrix_layout:
+                            synced = delete_matrix_meeting(selected_meeting["id"])
+                        else:
+                            synced = delete_meeting_rows(selected_meeting["id"])
+                        if not synced:
                             st.warning("Data synchronization failed, please try again later")
                         st.session_state.att_needs_refresh = True
 
@@ -391,18 +755,38 @@ def render_attendance():
                     key="att_update_meeting"
                 )
                 
-                # One-click set all present
-                if st.button("Set All Present", key="att_set_all"):
-                    success = True
-                    for member in st.session_state.att_members:
-                        st.session_state.att_records[(member["id"], selected_meeting["id"])] = True
-                        # Incremental update for each member
-                        if not incremental_update(member["id"], selected_meeting["id"], True):
-                            success = False
-                    
-                    st.success(f"All present for {selected_meeting['name']}")
-                    if not success:
+                # One-click set all present / absent (one batched write for the whole meeting)
+                col_all, col_none = st.columns(2)
+                set_all = col_all.button("Set All Present", key="att_set_all")
+                set_none = col_none.button("Set All Absent", key="att_set_none")
+                if set_all or set_none:
+                    changes = [(member["id"], selected_meeting["id"], set_all) for member in st.session_state.att_members]
+                    if bulk_update(changes):
+                        st.success(f"All {'present' if set_all else 'absent'} for {selected_meeting['name']}")
+                    else:
+                        st.warning("Some updates failed, please try syncing again")
+                    st.session_state.att_needs_refresh = True
+                
+                # Paste the names of the members who attended; everyone else is marked absent
+                present_text = st.text_area(
+                    "Present members (one name per line or comma-separated)",
+                    key="att_present_names"
+                )
+                if st.button("Apply Present List", key="att_apply_present"):
+                    names = {name.strip().lower() for name in present_text.replace(",", "\n").splitlines() if name.strip()}
+                    known = {member["name"].strip().lower() for member in st.session_state.att_members}
+                    changes = [
+                        (member["id"], selected_meeting["id"], member["name"].strip().lower() in names)
+                        for member in st.session_state.att_members
+                    ]
+                    if bulk_update(changes):
+                        present = sum(1 for _, _, is_present in changes if is_present)
+                        st.success(f"{present} present, {len(changes) - present} absent for {selected_meeting['name']}")
+                    else:
                         st.warning("Some updates failed, please try syncing again")
+                    unknown = sorted(names - known)
+                    if unknown:
+                        st.warning(f"Not in the member list: {', '.join(unknown)}")
                     st.session_state.att_needs_refresh = True
 
             # Update member status individually
@@ -427,9 +811,7 @@ def render_attendance():
                     st.success(f"Updated {selected_member['name']}'s status to {status}")
                     
                     if not incremental_update(selected_member["id"], selected_meeting["id"], new_status):
-                        st.warning("Update failed, falling back to full sync...")
-                        if not full_update_sheets():
-                            st.warning("Full synchronization also failed")
+                        st.warning("Update failed, please sync and try again")
                     
                     st.session_state.att_needs_refresh = True
     else:
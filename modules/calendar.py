@@ -10,7 +10,8 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
 # Import Google Sheets utility class
-from google_sheet_utils import GoogleSheetHandler
+from storage_utils import get_storage_backend
+from frame_utils import frame_from_values
 
 # Custom CSS styles
 def add_custom_css():
@@ -61,8 +62,8 @@ def render_calendar():
     sheet_handler = None
     calendar_sheet = None
     try:
-        creds_path = os.path.join(ROOT_DIR, "credentials.json")
-        sheet_handler = GoogleSheetHandler(credentials_path=creds_path)
+        # Same cache key as every other module, so calendar shares the process-wide handler
+        sheet_handler = get_storage_backend(credentials_path="")
         calendar_sheet = sheet_handler.get_worksheet(
             spreadsheet_name="Student",
             worksheet_name="Calendar"
@@ -73,29 +74,22 @@ def render_calendar():
     # Sync data from Google Sheets (using cal_events state)
     if calendar_sheet and sheet_handler:
         try:
-            all_data = calendar_sheet.get_all_values()
+            frame = sheet_handler.get_frame(calendar_sheet)
             expected_headers = ["date", "event"]
             
             # Check headers
-            if not all_data or all_data[0] != expected_headers:
-                calendar_sheet.clear()
-                calendar_sheet.append_row(expected_headers)
-                records = []
+            if list(frame.columns) != expected_headers:
+                sheet_handler.clear_worksheet(calendar_sheet)
+                sheet_handler.append_record(calendar_sheet, expected_headers)
+                events = frame_from_values("Calendar", [expected_headers])
             else:
-                # Process data (skip header)
-                records = [
-                    {"date": row[0], "event": row[1]} 
-                    for row in all_data[1:] 
-                    if row[0] and row[1]  # Ensure date and event are not empty
-                ]
+                # Ensure date (parsed) and event are not empty
+                events = frame[frame["date"].notna() & (frame["event"] != "")]
             
-            # Convert to datetime format and update session state
+            # Update session state with date objects
             st.session_state.cal_events = [
-                {
-                    "date": datetime.strptime(record["date"], "%Y-%m-%d").date(),
-                    "description": record["event"]
-                } 
-                for record in records
+                {"date": event_date, "description": event}
+                for event_date, event in zip(events["date"].dt.date, events["event"])
             ]
         except Exception as e:
             st.warning(f"Data synchronization failed: {str(e)}")
@@ -253,14 +247,16 @@ def render_calendar():
                     # Sync to Google Sheets
                     if calendar_sheet and sheet_handler:
                         try:
-                            # Delete old records
-                            all_rows = calendar_sheet.get_all_values()
-                            for i, row in enumerate(all_rows[1:], start=2):
-                                if row[0] == str(selected_date):
-                                    calendar_sheet.delete_rows(i)
+                            # Delete old records (one request, row numbers taken before any delete)
+                            sheet_handler.verify_snapshot(calendar_sheet)
+                            all_rows = sheet_handler.get_all_values(calendar_sheet)
+                            sheet_handler.delete_rows_checked(calendar_sheet, {
+                                i: str(selected_date) for i, row in enumerate(all_rows[1:], start=2)
+                                if row and row[0] == str(selected_date)
+                            }, "date")
                             
                             # Add new record
-                            calendar_sheet.append_row([str(selected_date), event_desc.strip()])
+                            sheet_handler.append_record(calendar_sheet, [str(selected_date), event_desc.strip()])
                             st.success("✅ Event saved successfully!")
                             st.rerun()
                         except Exception as e:
@@ -281,10 +277,12 @@ def render_calendar():
                     # Sync deletion to Google Sheets
                     if calendar_sheet and sheet_handler:
                         try:
-                            all_rows = calendar_sheet.get_all_values()
-                            for i, row in enumerate(all_rows[1:], start=2):
-                                if row[0] == str(selected_date):
-                                    calendar_sheet.delete_rows(i)
+                            sheet_handler.verify_snapshot(calendar_sheet)
+                            all_rows = sheet_handler.get_all_values(calendar_sheet)
+                            sheet_handler.delete_rows_checked(calendar_sheet, {
+                                i: str(selected_date) for i, row in enumerate(all_rows[1:], start=2)
+                                if row and row[0] == str(selected_date)
+                            }, "date")
                             st.success("✅ Event deleted successfully!")
                             st.rerun()
                         except Exception as e:
@@ -10,8 +10,8 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-# Reuse existing Google Sheets utility class
-from google_sheet_utils import GoogleSheetHandler
+# Reuse the shared Google Sheets handler
+from storage_utils import get_storage_backend
 
 def render_credit_rewards():
     st.header("🎓 Credit Information List")
@@ -19,53 +19,60 @@ def render_credit_rewards():
     st.caption("Data is synced in real-time from Google Sheets (Spreadsheet: Student, Worksheets: credits and information)")
 
     try:
-        # 1. Initialize utility class
+        # 1. Get shared utility class instance
         credentials_path = ""
-        gsheet = GoogleSheetHandler(credentials_path=credentials_path)
+        gsheet = get_storage_backend(credentials_path=credentials_path)
 
         # 2. Configure main spreadsheet name
         spreadsheet_name = "Student"
 
-        # 3. Open main spreadsheet
+        # 3. Open main spreadsheet (handle is cached by the shared handler)
         try:
-            spreadsheet = gsheet.client.open(spreadsheet_name)
+            gsheet.get_spreadsheet(spreadsheet_name)
         except gspread.SpreadsheetNotFound:
             st.error(f"❌ Spreadsheet '{spreadsheet_name}' does not exist")
             st.info("Please check if there is a Google Spreadsheet named 'Student'")
             return
 
-        # ---------------------- Read credit data (credits worksheet) ----------------------
+        # ---------------------- Open both worksheets (credits and information) ----------------------
         worksheet_credits = "credits"  # Credits data worksheet
         try:
-            worksheet_1 = spreadsheet.worksheet(worksheet_credits)
-            credit_data = gsheet.get_all_records(worksheet_1)
-        except gspread.WorksheetNotFound:
+            worksheet_1 = gsheet.get_worksheet(spreadsheet_name, worksheet_credits)
+        except Exception as e:
+            if "Worksheet not found" not in str(e):
+                raise
             st.error(f"❌ Worksheet '{worksheet_credits}' does not exist")
             st.info("Please create a worksheet named 'credits' in the 'Student' spreadsheet")
             return
 
-        # Display credit data
-        if not credit_data:
-            st.info(f"No data available in worksheet '{worksheet_credits}'")
-            return
-
-        with st.container(height=450):
-            st.dataframe(credit_data, use_container_width=True, hide_index=True)
-
-        # ---------------------- Read information data (information worksheet) ----------------------
         worksheet_info = "information"  # Information worksheet (needs to be created in Google Sheet)
-        info_data = None
+        worksheet_2 = None
         try:
-            worksheet_2 = spreadsheet.worksheet(worksheet_info)
-            info_data = gsheet.get_all_records(worksheet_2)  # Read data from new worksheet
-        except gspread.WorksheetNotFound:
+            worksheet_2 = gsheet.get_worksheet(spreadsheet_name, worksheet_info)
+        except Exception as e:
+            if "Worksheet not found" not in str(e):
+                raise
             st.warning(f"⚠️ Worksheet '{worksheet_info}' does not exist, will display default information table")
+
+        # Read both worksheets in a single batch request
+        if worksheet_2 is not None:
+            credit_data, info_data = gsheet.get_all_records_batch([worksheet_1, worksheet_2])
+        else:
+            credit_data = gsheet.get_all_records(worksheet_1)
             # If worksheet doesn't exist, display default static data
             info_data = {
                 "Reward Content": ["Milk Tea", "Potato Chips", "Coffee Shop Coupon", "Dance Ticket"],
                 "Required Credits": [50, 30, 80, 150]
             }
 
+        # Display credit data
+        if not credit_data:
+            st.info(f"No data available in worksheet '{worksheet_credits}'")
+            return
+
+        with st.container(height=450):
+            st.dataframe(credit_data, use_container_width=True, hide_index=True)
+
         # ---------------------- Display statistics and information table side by side ----------------------
         col1, col2 = st.columns([0.4, 0.6])
 
@@ -10,7 +10,8 @@ from datetime import datetime
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
-from google_sheet_utils import GoogleSheetHandler
+from storage_utils import get_storage_backend
+from frame_utils import frame_from_values
 
 # Define allowed access codes and corresponding group names (8 groups)
 ACCESS_CODES = {
@@ -24,6 +25,44 @@ ACCESS_CODES = {
     "PO5IU3YT": "Group 8"
 }
 
+# Columns of AllGroupsData the page renders (created_at is written but never displayed)
+DISPLAY_COLUMNS = ["group_code", "data_type", "uuid", "name", "student_id", "date", "amount", "description"]
+
+def delete_group_records(sheet_handler, main_sheet, uuids, group_code, data_type):
+    """Delete the current group's rows of one data type by uuid, all in one request
+
+    Row numbers come from one lookup checked against the sheet, not from the cached snapshot alone.
+    """
+    row_numbers = [
+        row_number for row_number, row in sheet_handler.find_rows(main_sheet, uuids).values()
+        # Double verification: ensure it's current group's data
+        if row[:2] == [group_code, data_type]
+    ]
+    return sheet_handler.delete_rows_batch(main_sheet, row_numbers)
+
+
+def render_bulk_delete(sheet_handler, main_sheet, state_key, data_type, describe):
+    """Admin-only multi-select delete for one data type of the current group"""
+    records = st.session_state[state_key]
+    if not st.session_state.get("auth_is_admin", False) or not records or not main_sheet:
+        return
+    st.divider()
+    labels = {record["uuid"]: describe(record) for record in records}
+    selected = st.multiselect(
+        "Select records to delete", list(labels), format_func=labels.get, key=f"bulk_del_{data_type}"
+    )
+    if st.button("Delete Selected", key=f"bulk_del_btn_{data_type}", disabled=not selected):
+        try:
+            deleted = delete_group_records(
+                sheet_handler, main_sheet, selected, st.session_state.current_group_code, data_type
+            )
+            st.session_state[state_key] = [x for x in records if x["uuid"] not in selected]
+            st.success(f"Deleted {deleted} records")
+            st.rerun()
+        except Exception as e:
+            st.warning(f"Deletion sync failed: {str(e)}")
+
+
 def render_groups():
     st.set_page_config(page_title="Student Affairs Management", layout="wide")
     
@@ -84,7 +123,7 @@ def render_groups():
     sheet_handler = None
     main_sheet = None
     try:
-        sheet_handler = GoogleSheetHandler(credentials_path="")  # Ensure credentials are configured correctly
+        sheet_handler = get_storage_backend(credentials_path="")  # Ensure credentials are configured correctly
         # Connect to the AllGroupsData worksheet in the existing Group file
         main_sheet = sheet_handler.get_worksheet(
             spreadsheet_name="Student",  # Your Google Sheet file name
@@ -107,7 +146,7 @@ def render_groups():
                                "name", "student_id",  # Member-specific fields
                                "date", "amount", "description",  # Income/reimbursement specific fields
                                "created_at"]  # Data creation time
-                    main_sheet.append_row(headers)
+                    sheet_handler.append_record(main_sheet, headers)
                     st.success("Worksheet AllGroupsData created successfully!")
                 except Exception as e2:
                     st.error(f"Failed to create worksheet: {str(e2)}")
@@ -116,59 +155,35 @@ def render_groups():
     current_code = st.session_state.current_group_code
     if main_sheet and sheet_handler:
         try:
-            all_rows = main_sheet.get_all_values()
-            if len(all_rows) < 1:
+            frame = sheet_handler.get_frame(main_sheet, columns=DISPLAY_COLUMNS)
+            if frame.columns.empty:
                 st.warning("Worksheet is empty, initializing header...")
                 headers = ["group_code", "data_type", "uuid", "name", "student_id", 
                            "date", "amount", "description", "created_at"]
-                main_sheet.append_row(headers)
-                all_rows = [headers]
+                sheet_handler.append_record(main_sheet, headers)
+                frame = frame_from_values("AllGroupsData", [DISPLAY_COLUMNS])
             
-            # Parse header row to determine field indices (avoid errors from field order changes)
-            header = all_rows[0]
-            col_indices = {col: idx for idx, col in enumerate(header)}
-            required_cols = ["group_code", "data_type", "uuid", "created_at"]
-            if not all(col in col_indices for col in required_cols):
+            # Columns are looked up by header name (avoid errors from field order changes)
+            required_cols = ["group_code", "data_type", "uuid"]
+            if not all(col in frame.columns for col in required_cols):
                 st.error("Worksheet header format is incorrect, please check if fields are complete")
                 return
 
-            # Filter current group's member data (data_type=member)
-            st.session_state.members = [
-                {
-                    "uuid": row[col_indices["uuid"]],
-                    "name": row[col_indices["name"]],
-                    "student_id": row[col_indices["student_id"]]
-                }
-                for row in all_rows[1:]  # Skip header row
-                if row[col_indices["group_code"]] == current_code 
-                and row[col_indices["data_type"]] == "member"
-            ]
-
-            # Filter current group's income data (data_type=income)
-            st.session_state.incomes = [
-                {
-                    "uuid": row[col_indices["uuid"]],
-                    "date": row[col_indices["date"]],
-                    "amount": row[col_indices["amount"]],
-                    "description": row[col_indices["description"]]
-                }
-                for row in all_rows[1:]
-                if row[col_indices["group_code"]] == current_code 
-                and row[col_indices["data_type"]] == "income"
-            ]
-
-            # Filter current group's reimbursement data (data_type=expense)
-            st.session_state.expenses = [
-                {
-                    "uuid": row[col_indices["uuid"]],
-                    "date": row[col_indices["date"]],
-                    "amount": row[col_indices["amount"]],
-                    "description": row[col_indices["description"]]
-                }
-                for row in all_rows[1:]
-                if row[col_indices["group_code"]] == current_code 
-                and row[col_indices["data_type"]] == "expense"
-            ]
+            # Current group's rows; dates and amounts are untyped strings, shown the way they are entered
+            group_rows = frame[frame["group_code"] == current_code]
+            entries = group_rows[["uuid", "data_type", "date", "amount", "description"]]
+            entry_fields = ["uuid", "date", "amount", "description"]
+
+            # Member data (data_type=member)
+            st.session_state.members = group_rows.loc[
+                group_rows["data_type"] == "member", ["uuid", "name", "student_id"]
+            ].to_dict("records")
+
+            # Income data (data_type=income)
+            st.session_state.incomes = entries.loc[entries["data_type"] == "income", entry_fields].to_dict("records")
+
+            # Reimbursement data (data_type=expense)
+            st.session_state.expenses = entries.loc[entries["data_type"] == "expense", entry_fields].to_dict("records")
 
         except Exception as e:
             st.warning(f"Data synchronization failed: {str(e)}")
@@ -211,7 +226,7 @@ def render_groups():
                 # Write to Google Sheet (single sheet)
                 if main_sheet:
                     try:
-                        main_sheet.append_row([
+                        sheet_handler.append_record(main_sheet, [
                             current_code,  # group_code
                             "member",      # data_type
                             member_uuid,   # uuid
@@ -249,16 +264,18 @@ def render_groups():
                             # Sheet deletion (locate by uuid)
                             if main_sheet:
                                 try:
-                                    cell = main_sheet.find(m["uuid"])
-                                    if cell:
-                                        row = main_sheet.row_values(cell.row)
+                                    found = sheet_handler.find_row(main_sheet, m["uuid"])
+                                    if found:
+                                        row_number, row = found
                                         # Double verification: ensure it's current group's data
                                         if row[0] == current_code and row[1] == "member":
-                                            main_sheet.delete_rows(cell.row)
+                                            sheet_handler.delete_rows(main_sheet, row_number)
                                             st.success(f"Deleted {m['name']}")
                                             st.rerun()
                                 except Exception as e:
                                     st.warning(f"Deletion sync failed: {str(e)}")
+                render_bulk_delete(sheet_handler, main_sheet, "members", "member",
+                                   lambda m: f"{m['name']} (ID: {m['student_id']})")
 
     # ---------------------- Income Management Module (Tab 2) ----------------------
     with tab2:
@@ -294,7 +311,7 @@ def render_groups():
                 # Write to Google Sheet
                 if main_sheet:
                     try:
-                        main_sheet.append_row([
+                        sheet_handler.append_record(main_sheet, [
                             current_code,
                             "income",
                             income_uuid,
@@ -331,15 +348,17 @@ def render_groups():
                             st.session_state.incomes = [x for x in st.session_state.incomes if x["uuid"] != income["uuid"]]
                             if main_sheet:
                                 try:
-                                    cell = main_sheet.find(income["uuid"])
-                                    if cell:
-                                        row = main_sheet.row_values(cell.row)
+                                    found = sheet_handler.find_row(main_sheet, income["uuid"])
+                                    if found:
+                                        row_number, row = found
                                         if row[0] == current_code and row[1] == "income":
-                                            main_sheet.delete_rows(cell.row)
+                                            sheet_handler.delete_rows(main_sheet, row_number)
                                             st.success("Income record deleted")
                                             st.rerun()
                                 except Exception as e:
                                     st.warning(f"Deletion sync failed: {str(e)}")
+                render_bulk_delete(sheet_handler, main_sheet, "incomes", "income",
+                                   lambda x: f"{x['date']} - ¥{x['amount']}: {x['description']}")
 
     # ---------------------- Reimbursement Management Module (Tab 3) ----------------------
     with tab3:
@@ -375,7 +394,7 @@ def render_groups():
                 # Write to Google Sheet
                 if main_sheet:
                     try:
-                        main_sheet.append_row([
+                        sheet_handler.append_record(main_sheet, [
                             current_code,
                             "expense",  # data type is expense
                             exp_uuid,
@@ -412,14 +431,16 @@ def render_groups():
                             st.session_state.expenses = [x for x in st.session_state.expenses if x["uuid"] != exp["uuid"]]
                             if main_sheet:
                                 try:
-                                    cell = main_sheet.find(exp["uuid"])
-                                    if cell:
-                                        row = main_sheet.row_values(cell.row)
+                                    found = sheet_handler.find_row(main_sheet, exp["uuid"])
+                                    if found:
+                                        row_number, row = found
                                         if row[0] == current_code and row[1] == "expense":
-                                            main_sheet.delete_rows(cell.row)
+                                            sheet_handler.delete_rows(main_sheet, row_number)
                                             st.success("Reimbursement record deleted")
                                             st.rerun()
                                 except Exception as e:
                                     st.warning(f"Deletion sync failed: {str(e)}")
+                render_bulk_delete(sheet_handler, main_sheet, "expenses", "expense",
+                                   lambda x: f"{x['date']} - ¥{x['amount']}: {x['description']}")
 
     st.divider()
@@ -9,7 +9,7 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 # Import Google Sheets utility class
-from google_sheet_utils import GoogleSheetHandler
+from storage_utils import get_storage_backend
 
 def render_money_transfers():
     """Render money transfer module interface (tra_ namespace)"""
@@ -19,7 +19,7 @@ def render_money_transfers():
     sheet_handler = None
     transfers_sheet = None
     try:
-        sheet_handler = GoogleSheetHandler(credentials_path="")
+        sheet_handler = get_storage_backend(credentials_path="")
         transfers_sheet = sheet_handler.get_worksheet(
             spreadsheet_name="Student",
             worksheet_name="MoneyTransfers"
@@ -29,28 +29,18 @@ def render_money_transfers():
     # Sync data from Google Sheets (using tra_records state)
     if transfers_sheet and sheet_handler and (not st.session_state.get("tra_records")):
         try:
-            all_data = transfers_sheet.get_all_values()
+            frame = sheet_handler.get_frame(transfers_sheet)
             expected_headers = ["uuid", "date", "type", "amount", "description", "handler"]
             
             # Check headers
-            if not all_data or all_data[0] != expected_headers:
-                transfers_sheet.clear()
-                transfers_sheet.append_row(expected_headers)
+            if list(frame.columns) != expected_headers:
+                sheet_handler.clear_worksheet(transfers_sheet)
+                sheet_handler.append_record(transfers_sheet, expected_headers)
                 records = []
             else:
-                # Process data (skip header row)
-                records = [
-                    {
-                        "uuid": row[0],
-                        "date": datetime.strptime(row[1], "%Y-%m-%d").date(),
-                        "type": row[2],
-                        "amount": float(row[3]),
-                        "description": row[4],
-                        "handler": row[5]
-                    } 
-                    for row in all_data[1:] 
-                    if row[0]  # Ensure UUID is not empty
-                ]
+                # Ensure UUID is not empty; rows with an unreadable date or amount are skipped
+                rows = frame[frame["uuid"] != ""].dropna(subset=["date", "amount"])
+                records = rows.assign(date=rows["date"].dt.date).to_dict("records")
             
             st.session_state.tra_records = records
         except Exception as e:
@@ -122,9 +112,7 @@ def render_money_transfers():
                             # Sync deletion to Google Sheets
                             if transfers_sheet and sheet_handler:
                                 try:
-                                    cell = transfers_sheet.find(trans["uuid"])
-                                    if cell:
-                                        transfers_sheet.delete_rows(cell.row)
+                                    sheet_handler.delete_record_by_value(transfers_sheet, trans["uuid"])
                                     st.success(f"Transaction {idx} deleted successfully!")
                                     st.rerun()
                                 except Exception as e:
@@ -133,6 +121,28 @@ def render_money_transfers():
                 # Row separator
                 st.markdown("---")
         
+        # Admins can delete several transactions at once (one request)
+        if st.session_state.auth_is_admin:
+            with st.expander("Delete Multiple Transactions", expanded=False):
+                labels = {
+                    t["uuid"]: f"{t['date'].strftime('%Y-%m-%d')} {t['type']} ¥{t['amount']:.2f} - {t['description']}"
+                    for t in st.session_state.tra_records
+                }
+                selected = st.multiselect(
+                    "Select transactions", list(labels), format_func=labels.get, key="tra_bulk_select"
+                )
+                if st.button("🗑️ Delete Selected", key="tra_bulk_delete", disabled=not selected):
+                    st.session_state.tra_records = [
+                        t for t in st.session_state.tra_records if t["uuid"] not in selected
+                    ]
+                    if transfers_sheet and sheet_handler:
+                        try:
+                            deleted = sheet_handler.delete_records_by_values(transfers_sheet, selected)
+                            st.success(f"{deleted} transactions deleted successfully!")
+                            st.rerun()
+                        except Exception as e:
+                            st.warning(f"Synchronization of deletion failed: {str(e)}")
+
         # Display summary information
         total_income = sum(t["amount"] for t in st.session_state.tra_records if t["type"] == "Income")
         total_expense = sum(t["amount"] for t in st.session_state.tra_records if t["type"] == "Expense")
@@ -209,7 +219,7 @@ def render_money_transfers():
             # Sync to Google Sheets
             if transfers_sheet and sheet_handler:
                 try:
-                    transfers_sheet.append_row([
+                    sheet_handler.append_record(transfers_sheet, [
                         new_trans["uuid"],
                         new_trans["date"].strftime("%Y-%m-%d"),
                         new_trans["type"],
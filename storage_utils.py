@@ -0,0 +1,492 @@
+# storage_utils.py
+import streamlit as st
+import os
+import re
+import sqlite3
+import threading
+
+# Known worksheets of the "Student" spreadsheet: header row, the columns looked up by key
+# and (where there is one) the column whose values identify a row uniquely
+TABLE_SCHEMAS = {
+    "users": {
+        "headers": ["username", "password", "register_time", "last_login"],
+        "indexes": ["username"],
+        "key": "username"
+    },
+    "Attendance": {
+        "headers": ["member_id", "member_name", "meeting_id", "meeting_name", "is_present", "updated_at"],
+        "indexes": ["member_id", "meeting_id"]
+    },
+    # Matrix attendance layout: one row per member, one column per meeting after these two
+    "AttendanceMatrix": {
+        "headers": ["member_id", "member_name"],
+        "indexes": ["member_id"],
+        "key": "member_id"
+    },
+    "AttendanceMeetings": {
+        "headers": ["meeting_id", "meeting_name", "created_at"],
+        "indexes": ["meeting_id"],
+        "key": "meeting_id"
+    },
+    "AllGroupsData": {
+        "headers": ["group_code", "data_type", "uuid", "name", "student_id",
+                    "date", "amount", "description", "created_at"],
+        "indexes": ["uuid", "group_code"],
+        "key": "uuid"
+    },
+    "Calendar": {
+        "headers": ["date", "event"],
+        "indexes": ["date"]
+    },
+    "MoneyTransfers": {
+        "headers": ["uuid", "date", "type", "amount", "description", "handler"],
+        "indexes": ["uuid", "date"],
+        "key": "uuid"
+    },
+}
+
+
+def _numericise(value):
+    """Same conversion as gspread's get_all_records: int, then float, else the string"""
+    if value == "":
+        return ""
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def select_columns(data, columns):
+    """Header plus rows of data restricted to the named columns, in that order
+
+    A column missing from the header comes back with a blank header cell and blank values,
+    so callers can still validate the header they got.
+    """
+    if not data:
+        return []
+    header = data[0]
+    indexes = [header.index(col) if col in header else None for col in columns]
+    return [[col if col in header else "" for col in columns]] + [
+        [row[i] if i is not None and i < len(row) else "" for i in indexes]
+        for row in data[1:]
+    ]
+
+
+def records_from_values(data):
+    """Rows (header first) as dicts keyed by header, numericised like gspread's get_all_records"""
+    if not data:
+        return []
+    header = data[0]
+    return [
+        dict(zip(header, [_numericise(v) for v in row + [""] * (len(header) - len(row))]))
+        for row in data[1:]
+    ]
+
+
+def column_letter(col):
+    """3 -> 'C', 28 -> 'AB'"""
+    label = ""
+    while col:
+        col, remainder = divmod(col - 1, 26)
+        label = chr(ord("A") + remainder) + label
+    return label
+
+
+def a1_to_rowcol(label):
+    """'B3' -> (3, 2)"""
+    match = re.match(r"^([A-Za-z]+)(\d+)$", label.strip())
+    if not match:
+        raise ValueError(f"Invalid A1 cell label: {label}")
+    col = 0
+    for char in match.group(1).upper():
+        col = col * 26 + ord(char) - ord("A") + 1
+    return int(match.group(2)), col
+
+
+class StorageBackend:
+    """Worksheet-level storage interface used by main.py and every module
+
+    Rows are lists of strings, row numbers are 1-based and the header is row 1,
+    exactly like a Google Sheets worksheet.
+    """
+    def get_spreadsheet(self, spreadsheet_name):
+        raise NotImplementedError
+
+    def get_worksheet(self, spreadsheet_name, worksheet_name):
+        raise NotImplementedError
+
+    def create_worksheet(self, spreadsheet_name, worksheet_name, rows=1000, cols=20):
+        raise NotImplementedError
+
+    def get_all_values(self, worksheet, force=False):
+        raise NotImplementedError
+
+    def get_all_records(self, worksheet):
+        """Get all records as dicts keyed by header"""
+        return records_from_values(self.get_all_values(worksheet))
+
+    def get_all_values_batch(self, worksheets, force=False):
+        """get_all_values of several worksheets (fetched in one request where the backend can)"""
+        return [self.get_all_values(worksheet, force=force) for worksheet in worksheets]
+
+    def get_all_records_batch(self, worksheets):
+        return [records_from_values(data) for data in self.get_all_values_batch(worksheets)]
+
+    def get_columns(self, worksheet, columns, force=False):
+        """Only the named columns of a worksheet (see select_columns)"""
+        return select_columns(self.get_all_values(worksheet, force=force), list(columns))
+
+    def get_frame(self, worksheet, columns=None, force=False):
+        """Typed pandas DataFrame of a worksheet (schemas in frame_utils.FRAME_SCHEMAS)"""
+        from frame_utils import frame_from_values
+        if columns is None:
+            return frame_from_values(worksheet.title, self.get_all_values(worksheet, force=force))
+        return frame_from_values(worksheet.title, self.get_columns(worksheet, columns, force=force))
+
+    def get_sheet_data(self, spreadsheet_name, worksheet_name):
+        return self.get_all_values(self.get_worksheet(spreadsheet_name, worksheet_name))
+
+    def append_record(self, worksheet, data):
+        self.append_records(worksheet, [data])
+
+    def append_records(self, worksheet, data_list):
+        raise NotImplementedError
+
+    def update_range(self, worksheet, range_name, values):
+        raise NotImplementedError
+
+    def update_ranges(self, worksheet, updates):
+        """Overwrite several A1 ranges [(range_name, values)] (one request where the backend can)"""
+        for range_name, values in updates:
+            self.update_range(worksheet, range_name, values)
+
+    def update_cell(self, worksheet, row, col, value):
+        raise NotImplementedError
+
+    def delete_rows(self, worksheet, start_index, end_index=None):
+        raise NotImplementedError
+
+    def clear_worksheet(self, worksheet):
+        raise NotImplementedError
+
+    def find_row(self, worksheet, value):
+        """(row_number, row_values) of the first row containing value, or None"""
+        raise NotImplementedError
+
+    def delete_record_by_value(self, worksheet, value):
+        raise NotImplementedError
+
+    def delete_rows_batch(self, worksheet, row_numbers):
+        """Delete any set of rows (1-based); bottom-up so the remaining row numbers stay valid"""
+        rows = sorted({int(row) for row in row_numbers}, reverse=True)
+        for row in rows:
+            self.delete_rows(worksheet, row)
+        return len(rows)
+
+    def find_rows(self, worksheet, values):
+        """{value: (row_number, row_values)} of the values found, row numbers fit for deletes"""
+        found = {}
+        for value in values:
+            row = self.find_row(worksheet, value)
+            if row:
+                found[str(value)] = row
+        return found
+
+    def delete_records_by_values(self, worksheet, values):
+        """Delete the rows holding each value; returns the number of rows deleted"""
+        return self.delete_rows_batch(worksheet, [row for row, _ in self.find_rows(worksheet, values).values()])
+
+    @staticmethod
+    def _check_rows(data, expected, column):
+        """Raise unless every {row_number: value} still holds value in column of data"""
+        header = data[0] if data else []
+        if column not in header:
+            raise Exception(f"Column not found: {column}")
+        idx = header.index(column)
+        for row_number, value in expected.items():
+            row = data[row_number - 1] if 1 < row_number <= len(data) else []
+            if len(row) <= idx or row[idx] != str(value):
+                raise Exception(
+                    f"Row {row_number} no longer holds {value}: the sheet was changed elsewhere, "
+                    "nothing was deleted. Reload and try again"
+                )
+
+    def delete_rows_checked(self, worksheet, expected, column):
+        """delete_rows_batch of {row_number: value}, refused if a row no longer holds its value in column"""
+        self._check_rows(self.get_all_values(worksheet), expected, column)
+        return self.delete_rows_batch(worksheet, list(expected))
+
+    def write_sheet(self, spreadsheet_name, worksheet_name, data):
+        raise NotImplementedError
+
+    # Backends without a write-behind queue apply queued writes immediately
+    def queue_update(self, worksheet, range_name, values):
+        self.update_range(worksheet, range_name, values)
+
+    def queue_append(self, worksheet, data_list):
+        self.append_records(worksheet, data_list)
+
+    def queue_delete_rows(self, worksheet, start_index, end_index=None):
+        self.delete_rows(worksheet, start_index, end_index)
+
+    def flush_writes(self, worksheet=None):
+        return True
+
+    def pop_write_errors(self, session_id=None):
+        return []
+
+    def invalidate_cache(self, worksheet):
+        pass
+
+    def verify_snapshot(self, worksheet):
+        """Make sure rows read next are current before row numbers are taken from them"""
+        pass
+
+    def cache_stats(self):
+        return None
+
+    def rate_limit_budget(self):
+        return None
+
+
+class SQLiteSpreadsheet:
+    """Spreadsheet handle of the SQLite backend (one database file)"""
+    def __init__(self, path, title):
+        self.id = path
+        self.title = title
+
+
+class SQLiteWorksheet:
+    """Worksheet handle of the SQLite backend (one table)"""
+    def __init__(self, spreadsheet, title, table, columns):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = table
+        self.table = table
+        self.columns = columns
+
+
+class SQLiteStorageBackend(StorageBackend):
+    """Embedded SQLite storage (WAL mode), one table per worksheet with indexed key columns"""
+    DEFAULT_COLUMNS = 20
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._spreadsheets = {}
+
+    @staticmethod
+    def _table_name(worksheet_name):
+        return "ws_" + re.sub(r"\W", "_", worksheet_name)
+
+    def _column_names(self, worksheet_name, cols):
+        headers = TABLE_SCHEMAS.get(worksheet_name, {}).get("headers", [])
+        cols = max(cols, len(headers))
+        # Known headers become column names so they can be indexed, the rest are c<n>
+        return [headers[i] if i < len(headers) else f"c{i + 1}" for i in range(cols)]
+
+    def _table_columns(self, table):
+        rows = self._conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        return [row[1] for row in rows if row[1] != "row_id"]
+
+    def get_spreadsheet(self, spreadsheet_name):
+        if spreadsheet_name not in self._spreadsheets:
+            self._spreadsheets[spreadsheet_name] = SQLiteSpreadsheet(self.path, spreadsheet_name)
+        return self._spreadsheets[spreadsheet_name]
+
+    def get_worksheet(self, spreadsheet_name, worksheet_name):
+        """Get worksheet table; known worksheets are created with their header on first use"""
+        table = self._table_name(worksheet_name)
+        with self._lock:
+            columns = self._table_columns(table)
+        if not columns:
+            if worksheet_name not in TABLE_SCHEMAS:
+                raise Exception(f"Worksheet not found: {worksheet_name}")
+            worksheet = self.create_worksheet(spreadsheet_name, worksheet_name)
+            self.append_record(worksheet, TABLE_SCHEMAS[worksheet_name]["headers"])
+            return worksheet
+        return SQLiteWorksheet(self.get_spreadsheet(spreadsheet_name), worksheet_name, table, columns)
+
+    def create_worksheet(self, spreadsheet_name, worksheet_name, rows=1000, cols=DEFAULT_COLUMNS):
+        table = self._table_name(worksheet_name)
+        columns = self._column_names(worksheet_name, int(cols))
+        column_defs = ", ".join(f'"{c}" TEXT NOT NULL DEFAULT \'\'' for c in columns)
+        with self._lock, self._conn:
+            # row_id keeps insertion order, which is the sheet's row order
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" (row_id INTEGER PRIMARY KEY AUTOINCREMENT, {column_defs})'
+            )
+            for column in TABLE_SCHEMAS.get(worksheet_name, {}).get("indexes", []):
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_{column}" ON "{table}" ("{column}")')
+            columns = self._table_columns(table)
+        return SQLiteWorksheet(self.get_spreadsheet(spreadsheet_name), worksheet_name, table, columns)
+
+    def delete_worksheet(self, spreadsheet_name, worksheet_name):
+        with self._lock, self._conn:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{self._table_name(worksheet_name)}"')
+
+    def _row_ids(self, worksheet, start_index, end_index):
+        """row_id of sheet rows start_index..end_index (1-based, inclusive)"""
+        rows = self._conn.execute(
+            f'SELECT row_id FROM "{worksheet.table}" ORDER BY row_id LIMIT ? OFFSET ?',
+            (end_index - start_index + 1, start_index - 1)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_all_values(self, worksheet, force=False):
+        with self._lock:
+            columns = ", ".join(f'"{c}"' for c in worksheet.columns)
+            rows = self._conn.execute(f'SELECT {columns} FROM "{worksheet.table}" ORDER BY row_id').fetchall()
+        # Trim like Sheets does: trailing empty columns and trailing empty rows
+        data = [list(row) for row in rows]
+        width = max((max((i + 1 for i, v in enumerate(row) if v != ""), default=0) for row in data), default=0)
+        data = [row[:width] for row in data]
+        while data and not any(data[-1]):
+            data.pop()
+        return data
+
+    def _ensure_width(self, worksheet, width):
+        """Add c<n> columns when a write is wider than the table"""
+        while len(worksheet.columns) < width:
+            column = f"c{len(worksheet.columns) + 1}"
+            self._conn.execute(f'ALTER TABLE "{worksheet.table}" ADD COLUMN "{column}" TEXT NOT NULL DEFAULT \'\'')
+            worksheet.columns.append(column)
+
+    def append_records(self, worksheet, data_list):
+        if not data_list:
+            return
+        with self._lock, self._conn:
+            self._ensure_width(worksheet, max(len(row) for row in data_list))
+            for row in data_list:
+                cells = ["" if v is None else str(v) for v in row]
+                columns = ", ".join(f'"{c}"' for c in worksheet.columns[:len(cells)])
+                self._conn.execute(
+                    f'INSERT INTO "{worksheet.table}" ({columns}) VALUES ({", ".join("?" * len(cells))})',
+                    cells
+                )
+
+    def update_range(self, worksheet, range_name, values):
+        start_row, start_col = a1_to_rowcol(range_name.split(":")[0])
+        with self._lock, self._conn:
+            self._ensure_width(worksheet, start_col - 1 + max(len(row) for row in values))
+            # Writing below the last row extends the table, like Sheets does
+            total = self._conn.execute(f'SELECT COUNT(*) FROM "{worksheet.table}"').fetchone()[0]
+            for _ in range(start_row + len(values) - 1 - total):
+                self._conn.execute(f'INSERT INTO "{worksheet.table}" DEFAULT VALUES')
+            row_ids = self._row_ids(worksheet, start_row, start_row + len(values) - 1)
+            for row_id, row in zip(row_ids, values):
+                columns = worksheet.columns[start_col - 1:start_col - 1 + len(row)]
+                assignments = ", ".join(f'"{c}" = ?' for c in columns)
+                cells = ["" if v is None else str(v) for v in row]
+                self._conn.execute(f'UPDATE "{worksheet.table}" SET {assignments} WHERE row_id = ?', cells + [row_id])
+
+    def update_cell(self, worksheet, row, col, value):
+        self.update_range(worksheet, f"{column_letter(col)}{row}", [[value]])
+
+    def delete_rows(self, worksheet, start_index, end_index=None):
+        end_index = end_index or start_index
+        with self._lock, self._conn:
+            row_ids = self._row_ids(worksheet, start_index, end_index)
+            self._conn.executemany(f'DELETE FROM "{worksheet.table}" WHERE row_id = ?', [(r,) for r in row_ids])
+
+    def clear_worksheet(self, worksheet):
+        with self._lock, self._conn:
+            self._conn.execute(f'DELETE FROM "{worksheet.table}"')
+
+    def _find_row_id(self, worksheet, value):
+        """row_id of the first row containing value (indexed lookup when the table has a uuid column)"""
+        search_columns = ["uuid"] if "uuid" in worksheet.columns else worksheet.columns
+        condition = " OR ".join(f'"{c}" = ?' for c in search_columns)
+        row = self._conn.execute(
+            f'SELECT row_id FROM "{worksheet.table}" WHERE {condition} ORDER BY row_id LIMIT 1',
+            [str(value)] * len(search_columns)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_row(self, worksheet, value):
+        with self._lock:
+            row_id = self._find_row_id(worksheet, value)
+            if row_id is None:
+                return None
+            columns = ", ".join(f'"{c}"' for c in worksheet.columns)
+            row_number = self._conn.execute(
+                f'SELECT COUNT(*) FROM "{worksheet.table}" WHERE row_id <= ?', (row_id,)
+            ).fetchone()[0]
+            values = self._conn.execute(
+                f'SELECT {columns} FROM "{worksheet.table}" WHERE row_id = ?', (row_id,)
+            ).fetchone()
+        values = list(values)
+        # row_values() in Sheets drops trailing empty cells
+        while values and values[-1] == "":
+            values.pop()
+        return row_number, values
+
+    def delete_record_by_value(self, worksheet, value):
+        with self._lock, self._conn:
+            row_id = self._find_row_id(worksheet, value)
+            if row_id is None:
+                return False
+            self._conn.execute(f'DELETE FROM "{worksheet.table}" WHERE row_id = ?', (row_id,))
+            return True
+
+    def write_sheet(self, spreadsheet_name, worksheet_name, data):
+        try:
+            worksheet = self.get_worksheet(spreadsheet_name, worksheet_name)
+        except Exception:
+            worksheet = self.create_worksheet(spreadsheet_name, worksheet_name)
+        self.clear_worksheet(worksheet)
+        self.append_records(worksheet, data)
+        return worksheet
+
+    def worksheet_names(self):
+        """Worksheets stored in this database"""
+        with self._lock:
+            tables = self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'ws_%'"
+            ).fetchall()
+        known = {self._table_name(name): name for name in TABLE_SCHEMAS}
+        return [known.get(table, table[3:]) for (table,) in tables]
+
+    def export_to(self, target, spreadsheet_name):
+        """Copy every table into another backend (e.g. Google Sheets as the human-editable export)"""
+        for worksheet_name in self.worksheet_names():
+            worksheet = self.get_worksheet(spreadsheet_name, worksheet_name)
+            target.write_sheet(spreadsheet_name, worksheet_name, self.get_all_values(worksheet))
+
+
+def get_storage_backend_name():
+    """"sheets" (default), "sqlite" or "fake" (in-memory Sheets, no credentials), from Streamlit secrets"""
+    try:
+        return st.secrets.get("storage_backend", "sheets")
+    except Exception:
+        return "sheets"
+
+
+@st.cache_resource(show_spinner=False)
+def get_storage_backend(credentials_path=""):
+    """Get the process-wide storage backend selected by the storage_backend secret"""
+    if get_storage_backend_name() == "sqlite":
+        try:
+            path = st.secrets.get("sqlite_path", os.path.join("data", "student.db"))
+        except Exception:
+            path = os.path.join("data", "student.db")
+        return SQLiteStorageBackend(path)
+    if get_storage_backend_name() == "fake":
+        from fake_sheets import FakeClient
+        from google_sheet_utils import GoogleSheetHandler
+        try:
+            latency = float(st.secrets.get("fake_latency", 0.0))
+        except Exception:
+            latency = 0.0
+        client = FakeClient(latency=latency)
+        return GoogleSheetHandler(credentials_path=credentials_path, client=client, drive=client.drive)
+    from google_sheet_utils import get_sheet_handler
+    return get_sheet_handler(credentials_path=credentials_path)
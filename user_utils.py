@@ -0,0 +1,303 @@
+# user_utils.py
+"""Process-wide username -> user record index of the users worksheet
+
+Logins, registrations and the sidebar look users up here instead of downloading the users
+tab each time. The index is rebuilt from the backend once its TTL runs out and is updated
+in place by the writes that go through it. Last-login timestamps are written behind: logins
+from many users are collected for a few seconds and sent as one batched update.
+
+Session tokens let a browser refresh or a new tab resume a login without touching Sheets:
+an HMAC-signed, expiring token kept in a browser cookie is verified locally. Log Out revokes
+every token of the user by bumping a per-user generation the tokens carry.
+"""
+import streamlit as st
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from storage_utils import TABLE_SCHEMAS, column_letter, get_storage_backend
+
+USER_FIELDS = TABLE_SCHEMAS["users"]["headers"]  # username, password, register_time, last_login
+
+
+class UserDirectory:
+    """username -> {"username", "password", "register_time", "last_login", "row"} for one users tab
+
+    "row" is the 1-based sheet row of the record when it was loaded. Writes do not trust it:
+    they take row numbers from backend.find_rows, checked against the sheet at write time.
+    """
+    def __init__(self, backend, spreadsheet_name, worksheet_name="users", ttl=300.0, login_flush_delay=5.0):
+        self.backend = backend
+        self.spreadsheet_name = spreadsheet_name
+        self.worksheet_name = worksheet_name
+        self.ttl = ttl
+        self.login_flush_delay = login_flush_delay  # Seconds last-login writes are collected for
+        self._lock = threading.Lock()
+        self._records = None  # Format: {username: record}
+        self._next_row = 2  # Sheet row the next appended user lands on
+        self._expires_at = 0.0
+        self._pending_logins = {}  # Format: {username: last_login}, latest login per user wins
+        self._login_timer = None
+        # Format: {username: n}; in memory, so a restart forgets revocations (tokens still expire)
+        self._session_generations = {}
+
+    def _worksheet(self):
+        """The users worksheet, created with its header row when missing"""
+        try:
+            return self.backend.get_worksheet(self.spreadsheet_name, self.worksheet_name)
+        except Exception:
+            worksheet = self.backend.create_worksheet(
+                self.spreadsheet_name, self.worksheet_name, rows=100, cols=len(USER_FIELDS)
+            )
+            self.backend.append_record(worksheet, USER_FIELDS)
+            return worksheet
+
+    def _load(self):
+        worksheet = self._worksheet()
+        self.backend.verify_snapshot(worksheet)  # Record rows are written to by number
+        data = self.backend.get_all_values(worksheet)
+        records = {}
+        for row_num, row in enumerate(data[1:], start=2):
+            if not row or not row[0]:
+                continue
+            values = list(row[:len(USER_FIELDS)]) + [""] * (len(USER_FIELDS) - len(row))
+            # First occurrence wins, like the old top-down scan
+            records.setdefault(row[0], dict(zip(USER_FIELDS, values), row=row_num))
+        self._records = records
+        self._next_row = max(len(data), 1) + 1
+        self._expires_at = time.monotonic() + self.ttl
+
+    def _ensure_loaded(self):
+        if self._records is None or time.monotonic() >= self._expires_at:
+            self._load()
+
+    def get(self, username):
+        """Copy of the user's record, or None"""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._records.get(username)
+        return dict(record) if record else None
+
+    def usernames(self):
+        with self._lock:
+            self._ensure_loaded()
+            return set(self._records)
+
+    def add(self, row):
+        """Append one user row (USER_FIELDS order); False if the username is taken"""
+        with self._lock:
+            self._ensure_loaded()
+            if row[0] in self._records:
+                return False
+            self.backend.append_record(self._worksheet(), row)
+            self._records[row[0]] = dict(zip(USER_FIELDS, row), row=self._next_row)
+            self._next_row += 1
+            return True
+
+    def add_many(self, rows):
+        """Append every row whose username is new (in the sheet and in rows) with one batched write
+
+        Returns the rows that were written.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            new_rows, seen = [], set()
+            for row in rows:
+                if row[0] and row[0] not in self._records and row[0] not in seen:
+                    seen.add(row[0])
+                    new_rows.append(row)
+            if not new_rows:
+                return []
+            self.backend.append_records(self._worksheet(), new_rows)
+            for offset, row in enumerate(new_rows):
+                self._records[row[0]] = dict(zip(USER_FIELDS, row), row=self._next_row + offset)
+            self._next_row += len(new_rows)
+            return new_rows
+
+    def _current_rows(self, worksheet, usernames):
+        """{username: sheet row} of the users still in the sheet; the index is reloaded if rows moved
+
+        Called with the lock held.
+        """
+        found = self.backend.find_rows(worksheet, usernames)
+        rows = {username: found[username][0] for username in usernames if username in found}
+        records = self._records or {}
+        if any(records.get(username, {}).get("row") != rows.get(username) for username in usernames):
+            self._load()  # The sheet was edited elsewhere; the snapshot was just refreshed
+        return rows
+
+    def update_field(self, username, field, value):
+        """Write one field of a user's row; False if the user is unknown"""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._records.get(username)
+            if record is None:
+                return False
+            worksheet = self._worksheet()
+            row = self._current_rows(worksheet, [username]).get(username)
+            if row is None:
+                return False
+            self.backend.update_cell(worksheet, row, USER_FIELDS.index(field) + 1, value)
+            self._records.get(username, record)[field] = value
+            return True
+
+    def record_login(self, username, timestamp):
+        """Set last_login in the index now and queue the sheet write; False if the user is unknown"""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._records.get(username)
+            if record is None:
+                return False
+            record["last_login"] = timestamp
+            self._pending_logins[username] = timestamp
+            if self._login_timer is None:
+                self._login_timer = threading.Timer(self.login_flush_delay, self.flush_logins)
+                self._login_timer.daemon = True
+                self._login_timer.start()
+            return True
+
+    def flush_logins(self):
+        """Write all queued last-login timestamps as one batched update, True on success"""
+        with self._lock:
+            self._login_timer = None
+            pending, self._pending_logins = self._pending_logins, {}
+            if not pending or self._records is None:
+                return True
+            column = column_letter(USER_FIELDS.index("last_login") + 1)
+            worksheet = self._worksheet()
+        try:
+            with self._lock:
+                # One lookup for the whole batch, checked against the sheet rather than the index
+                rows = self._current_rows(worksheet, list(pending))
+                for username, timestamp in pending.items():
+                    if username in rows and username in self._records:
+                        self._records[username]["last_login"] = timestamp  # Survives a reload
+            for username, timestamp in pending.items():
+                if username in rows:
+                    self.backend.queue_update(worksheet, f"{column}{rows[username]}", [[timestamp]])
+            if self.backend.flush_writes(worksheet):
+                return True
+        except Exception:
+            pass
+        # Rows may have moved under us (e.g. edited by hand), reload before the next write
+        self.invalidate()
+        return False
+
+    def invalidate(self):
+        """Reload from the backend on next use (e.g. after the sheet was edited by hand)"""
+        with self._lock:
+            self._records = None
+
+    def session_generation(self, username):
+        """Generation new session tokens of the user carry; older ones are revoked"""
+        with self._lock:
+            return self._session_generations.get(username, 0)
+
+    def revoke_sessions(self, username):
+        """Invalidate every session token issued to the user so far (Log Out)"""
+        with self._lock:
+            self._session_generations[username] = self._session_generations.get(username, 0) + 1
+
+
+def _float_secret(name, default):
+    try:
+        return float(st.secrets.get(name, default))
+    except Exception:
+        return float(default)
+
+
+@st.cache_resource(show_spinner=False)
+def get_user_directory(spreadsheet_name, worksheet_name="users"):
+    """Get the process-wide UserDirectory of a users tab (shared by all sessions)"""
+    return UserDirectory(
+        get_storage_backend(credentials_path=""), spreadsheet_name, worksheet_name,
+        ttl=_float_secret("user_directory_ttl", 300),
+        login_flush_delay=_float_secret("login_flush_delay", 5)
+    )
+
+
+# ---------------------- Bulk provisioning ----------------------
+def generate_password(length=10):
+    alphabet = string.ascii_letters + string.digits
+    return "".join(secrets.choice(alphabet) for _ in range(length))
+
+
+def provision_users(directory, usernames, hash_password, registered_at, workers=8):
+    """Create accounts with random initial passwords for the usernames not registered yet
+
+    Passwords are hashed in a worker pool and all new users go out in one append.
+    Returns [(username, initial password)] of the accounts created.
+    """
+    existing = directory.usernames()
+    usernames = [name for name in dict.fromkeys(usernames) if name and name not in existing]
+    if not usernames:
+        return []
+    passwords = [generate_password() for _ in usernames]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashed = list(pool.map(hash_password, passwords))
+    rows = [[name, pwd_hash, registered_at, ""] for name, pwd_hash in zip(usernames, hashed)]
+    created = {row[0] for row in directory.add_many(rows)}
+    return [(name, password) for name, password in zip(usernames, passwords) if name in created]
+
+
+# ---------------------- Session tokens ----------------------
+@st.cache_resource(show_spinner=False)
+def _process_session_secret():
+    """Random key for servers without a session_secret (tokens then end with the process)"""
+    return secrets.token_hex(32)
+
+
+def get_session_secret():
+    try:
+        secret = st.secrets.get("session_secret")
+    except Exception:
+        secret = None
+    return str(secret) if secret else _process_session_secret()
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload, secret):
+    return _b64encode(hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+def get_session_token_ttl():
+    return _float_secret("session_token_ttl", 12 * 3600)
+
+
+def issue_session_token(username, profile=None, generation=0, ttl=None, secret=None):
+    """Signed token naming username (plus the sidebar profile and session generation), valid for ttl seconds"""
+    ttl = get_session_token_ttl() if ttl is None else ttl
+    payload = _b64encode(json.dumps(
+        {"u": username, "p": profile or {}, "g": generation, "exp": int(time.time() + ttl)},
+        separators=(",", ":")
+    ).encode())
+    return f"{payload}.{_sign(payload, secret or get_session_secret())}"
+
+
+def verify_session_token(token, secret=None):
+    """{"username", "profile", "generation"} of a valid, unexpired token, else None (no backend calls)
+
+    Callers still have to check the user exists and the generation is current.
+    """
+    try:
+        payload, signature = token.split(".", 1)
+        if not hmac.compare_digest(signature, _sign(payload, secret or get_session_secret())):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except Exception:
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+        return None
+    return {"username": claims.get("u", ""), "profile": claims.get("p") or {}, "generation": claims.get("g", 0)}